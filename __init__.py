@@ -24,30 +24,43 @@ def register():
     translations.register_translations()
     for func in func_list:
         func.register()
+
+    # 后台模式（渲染农场/命令行）：不扫描、不移动面板、不注册定时器和处理器；
+    # 在偏好设置注册之后判断，run_in_background 才会生效
+    if common.is_headless():
+        return
+
+    # 恢复面板用的处理器
+    ui.register_handlers()
     
     # 从偏好设置中加载额外排除的类别
-    from . import common
     common.load_additional_excluded_from_preferences()
-    # 延迟刷新
-    def deferred_refresh():
-        try:
-            # 先扫描可用类别
-            bpy.ops.addonmanager.scan_available_categories()
-            bpy.ops.addonmanager.apply_excluded_categories()
-
-            bpy.ops.addonmanager.refresh_categories()
-        except Exception as e:
-            print(f"Error during initial category refresh: {e}")
-        return None
-    
-    bpy.app.timers.register(deferred_refresh, first_interval=0.1)
+    # 延迟刷新：单次完成扫描、排除和类别列表的建立；
+    # 懒加载模式下等到首次绘制管理器面板时再建立
+    from . import startup
+    if not startup.is_lazy():
+        startup.request_startup(first_interval=0.1)
+    # 定时增量同步插件启用/禁用带来的面板变化
+    from . import panel_index
+    bpy.app.timers.register(panel_index.sync_timer, first_interval=2.0, persistent=True)
 
 # 注销函数
 def unregister():
 
     translations.unregister_translations()
-    # 先恢复面板
-    ui.restore_panels(force=True)
+    from . import panel_index
+    if bpy.app.timers.is_registered(panel_index.sync_timer):
+        bpy.app.timers.unregister(panel_index.sync_timer)
+    common.cancel_pending_switch()
+    from . import redraw
+    redraw.cancel()
+    # 写入尚未保存的收藏变化
+    common.flush_favorites()
+    from . import startup
+    startup.reset_state()
+    # 先恢复面板（后台模式下没有移动过面板）
+    if common.currently_managed_panels:
+        ui.restore_panels(force=True)
     
     # 然后注销各模块
     for func in reversed(func_list):
@@ -0,0 +1,419 @@
+"""无 Blender 环境下使用的 bpy 替身模块
+
+只模拟本插件用到的那一部分 API：
+- bpy.types.Panel 子类树与按 bl_idname 注册到 bpy.types 的行为
+- bpy.utils.register_class / unregister_class（每次调用可配置耗时）
+- bpy.props 属性（含 update 回调）与 CollectionProperty
+- bpy.app.timers / handlers / translations，bpy.ops 操作符分发
+"""
+import sys
+import time
+import types
+
+# --- 统计与配置 ---
+config = {
+    'register_cost': 0.0,   # 每次 register/unregister 调用模拟的耗时（秒）
+}
+counters = {
+    'register_class': 0,
+    'unregister_class': 0,
+    'tag_redraw': 0,
+    'redraw_timer': 0,
+}
+
+
+def reset_counters():
+    for key in counters:
+        counters[key] = 0
+
+
+def _spend(seconds):
+    if seconds <= 0:
+        return
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+# --- 属性 ---
+class _PropDef:
+    """属性定义，注册后作为描述符挂在类上"""
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        self.kwargs = kwargs
+        self.name = None
+
+    def _default(self):
+        if self.kind == 'collection':
+            return _Collection(self.kwargs.get('type'))
+        if 'default' in self.kwargs:
+            return self.kwargs['default']
+        return {'string': "", 'int': 0, 'bool': False, 'enum': None}.get(self.kind)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        values = instance.__dict__.setdefault('_prop_values', {})
+        if self not in values:
+            values[self] = self._default()
+        return values[self]
+
+    def __set__(self, instance, value):
+        if self.kind == 'collection':
+            raise AttributeError("collection properties are read-only")
+        if self.kind == 'int':
+            value = int(value)
+            if 'min' in self.kwargs:
+                value = max(self.kwargs['min'], value)
+            if 'max' in self.kwargs:
+                value = min(self.kwargs['max'], value)
+        values = instance.__dict__.setdefault('_prop_values', {})
+        values[self] = value
+        update = self.kwargs.get('update')
+        if update is not None:
+            update(instance, context)
+
+
+class _Collection:
+    def __init__(self, item_type):
+        self._type = item_type
+        self._items = []
+
+    def add(self):
+        item = self._type() if self._type is not None else types.SimpleNamespace()
+        self._items.append(item)
+        return item
+
+    def remove(self, index):
+        del self._items[index]
+
+    def clear(self):
+        self._items.clear()
+
+    def move(self, from_index, to_index):
+        item = self._items.pop(from_index)
+        self._items.insert(to_index, item)
+
+    def find(self, name):
+        for i, item in enumerate(self._items):
+            if getattr(item, 'name', None) == name:
+                return i
+        return -1
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+
+def _make_prop(kind):
+    def factory(**kwargs):
+        return _PropDef(kind, **kwargs)
+    return factory
+
+
+props = types.ModuleType('bpy.props')
+props.StringProperty = _make_prop('string')
+props.IntProperty = _make_prop('int')
+props.FloatProperty = _make_prop('float')
+props.BoolProperty = _make_prop('bool')
+props.EnumProperty = _make_prop('enum')
+props.CollectionProperty = _make_prop('collection')
+props.PointerProperty = _make_prop('pointer')
+
+
+def _install_annotations(cls):
+    for klass in reversed(cls.__mro__):
+        for name, value in list(getattr(klass, '__annotations__', {}).items()):
+            if isinstance(value, _PropDef) and not isinstance(cls.__dict__.get(name), _PropDef):
+                value.name = name
+                setattr(cls, name, value)
+
+
+# --- 类型 ---
+class _Layout:
+    """接受任意布局调用的占位对象"""
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            return _Layout()
+        return call
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+
+
+class _StructBase:
+    def __init__(self):
+        _install_annotations(type(self))
+
+
+class Panel(_StructBase):
+    bl_options = set()
+    layout = _Layout()
+
+    def __init__(self):
+        super().__init__()
+        self.layout = _Layout()
+
+
+class Operator(_StructBase):
+    def report(self, level, message):
+        pass
+
+
+class UIList(_StructBase):
+    bitflag_filter_item = 1 << 30
+    layout_type = 'DEFAULT'
+
+
+class UI_UL_list:
+    @staticmethod
+    def sort_items_by_name(items, propname="name"):
+        names = [(getattr(item, propname, ""), i) for i, item in enumerate(items)]
+        names.sort(key=lambda pair: pair[0].lower())
+        order = [0] * len(names)
+        for new_index, (_, old_index) in enumerate(names):
+            order[old_index] = new_index
+        return order
+
+
+class PropertyGroup(_StructBase):
+    pass
+
+
+class AddonPreferences(_StructBase):
+    pass
+
+
+class Scene:
+    pass
+
+
+class WindowManager:
+    pass
+
+
+class _Types(types.ModuleType):
+    pass
+
+
+bpy_types = _Types('bpy.types')
+for _cls in (Panel, Operator, UIList, UI_UL_list, PropertyGroup, AddonPreferences, Scene, WindowManager):
+    setattr(bpy_types, _cls.__name__, _cls)
+
+_BUILTIN_TYPES = set(vars(bpy_types))
+
+
+# --- 注册 ---
+_registered = {}
+
+
+def _idname(cls):
+    return getattr(cls, 'bl_idname', None) or cls.__name__
+
+
+def register_class(cls):
+    counters['register_class'] += 1
+    _spend(config['register_cost'])
+    name = cls.__name__
+    if _registered.get(name) is cls:
+        raise ValueError(f"register_class(...): already registered as a subclass '{name}'")
+    if issubclass(cls, Panel):
+        parent_id = getattr(cls, 'bl_parent_id', "")
+        if parent_id and not isinstance(getattr(bpy_types, parent_id, None), type):
+            raise RuntimeError(f"register_class(...): parent '{parent_id}' for '{name}' not found")
+        name = _idname(cls)
+    _install_annotations(cls)
+    _registered[name] = cls
+    if not issubclass(cls, Operator):
+        setattr(bpy_types, name, cls)
+    else:
+        _operators[cls.bl_idname] = cls
+
+
+def unregister_class(cls):
+    counters['unregister_class'] += 1
+    _spend(config['register_cost'])
+    name = _idname(cls) if issubclass(cls, Panel) else cls.__name__
+    if _registered.get(name) is not cls:
+        raise RuntimeError(f"unregister_class(...): missing bl_rna attribute from '{cls.__name__}'")
+    del _registered[name]
+    if issubclass(cls, Operator):
+        _operators.pop(cls.bl_idname, None)
+    elif getattr(bpy_types, name, None) is cls:
+        delattr(bpy_types, name)
+
+
+utils = types.ModuleType('bpy.utils')
+utils.register_class = register_class
+utils.unregister_class = unregister_class
+utils.user_resource = lambda resource_type, path="", create=False: _user_resource(resource_type, path, create)
+
+_user_dir = None
+
+
+def _user_resource(resource_type, path, create):
+    import atexit
+    import os
+    import shutil
+    import tempfile
+    global _user_dir
+    if _user_dir is None:
+        # 每个进程一个临时用户目录（扫描缓存等写在这里），进程退出时删除
+        _user_dir = tempfile.mkdtemp(prefix="fake_bpy_")
+        atexit.register(shutil.rmtree, _user_dir, ignore_errors=True)
+    full = os.path.join(_user_dir, resource_type.lower(), path)
+    if create:
+        os.makedirs(full, exist_ok=True)
+    return full
+
+
+# --- 操作符分发 ---
+_operators = {}
+
+
+class _OpCall:
+    def __init__(self, idname):
+        self.idname = idname
+
+    def __call__(self, *args, **kwargs):
+        if self.idname == 'wm.redraw_timer':
+            counters['redraw_timer'] += 1
+            return {'FINISHED'}
+        cls = _operators.get(self.idname)
+        if cls is None:
+            raise AttributeError(f"Calling operator \"bpy.ops.{self.idname}\" error, could not be found")
+        op = cls()
+        for key, value in kwargs.items():
+            setattr(op, key, value)
+        if hasattr(cls, 'poll') and not cls.poll(context):
+            raise RuntimeError(f"Operator bpy.ops.{self.idname}.poll() failed, context is incorrect")
+        return op.execute(context)
+
+
+class _OpModule:
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, item):
+        return _OpCall(f"{self.name}.{item}")
+
+
+class _Ops(types.ModuleType):
+    def __getattr__(self, item):
+        return _OpModule(item)
+
+
+ops = _Ops('bpy.ops')
+
+
+# --- app ---
+class _Timers:
+    def __init__(self):
+        self.pending = []
+
+    def register(self, func, first_interval=0.0, persistent=False):
+        self.pending.append(func)
+
+    def unregister(self, func):
+        if func in self.pending:
+            self.pending.remove(func)
+
+    def is_registered(self, func):
+        return func in self.pending
+
+    def run_all(self, max_rounds=100):
+        """依次执行已注册的定时器，直到队列为空（返回数值的定时器会再次排队）"""
+        for _ in range(max_rounds):
+            if not self.pending:
+                return
+            current, self.pending = self.pending, []
+            for func in current:
+                result = func()
+                if result is not None and func not in self.pending:
+                    self.pending.append(func)
+
+
+def persistent(func):
+    return func
+
+
+app = types.ModuleType('bpy.app')
+app.background = False
+app.version = (4, 2, 0)
+app.timers = _Timers()
+app.handlers = types.SimpleNamespace(load_post=[], save_pre=[], persistent=persistent)
+app.translations = types.SimpleNamespace(register=lambda name, data: None, unregister=lambda name: None)
+handlers_module = types.ModuleType('bpy.app.handlers')
+handlers_module.persistent = persistent
+handlers_module.load_post = app.handlers.load_post
+handlers_module.save_pre = app.handlers.save_pre
+app.handlers = handlers_module
+
+
+# --- context ---
+class _Area:
+    def __init__(self, area_type, ui_visible=True):
+        self.type = area_type
+        self.regions = [types.SimpleNamespace(type='WINDOW', width=800),
+                        types.SimpleNamespace(type='UI', width=300 if ui_visible else 1)]
+        self.spaces = types.SimpleNamespace(active=types.SimpleNamespace(type=area_type, show_region_ui=ui_visible))
+        self.redraw_count = 0
+
+    def tag_redraw(self):
+        counters['tag_redraw'] += 1
+        self.redraw_count += 1
+
+
+class _Addons(dict):
+    pass
+
+
+def _make_context():
+    ctx = types.SimpleNamespace()
+    ctx.scene = Scene()
+    ctx.preferences = types.SimpleNamespace(addons=_Addons())
+    areas = [_Area('VIEW_3D'), _Area('VIEW_3D', ui_visible=False), _Area('PROPERTIES'),
+             _Area('OUTLINER'), _Area('PREFERENCES')]
+    window = types.SimpleNamespace(screen=types.SimpleNamespace(areas=areas))
+    ctx.window_manager = types.SimpleNamespace(windows=[window])
+    ctx.space_data = types.SimpleNamespace(type='VIEW_3D')
+    return ctx
+
+
+context = _make_context()
+
+
+def install():
+    """把替身模块注册到 sys.modules，供插件代码 import bpy"""
+    module = sys.modules.get('bpy')
+    if module is None:
+        module = types.ModuleType('bpy')
+        sys.modules['bpy'] = module
+    module.types = bpy_types
+    module.props = props
+    module.utils = utils
+    module.ops = ops
+    module.app = app
+    module.context = context
+    sys.modules['bpy.types'] = bpy_types
+    sys.modules['bpy.props'] = props
+    sys.modules['bpy.utils'] = utils
+    sys.modules['bpy.ops'] = ops
+    sys.modules['bpy.app'] = app
+    sys.modules['bpy.app.handlers'] = handlers_module
+    return module
+
+
+def attach_preferences(addon_package, preferences_cls):
+    """模拟 Blender 为已启用插件创建偏好设置实例"""
+    _install_annotations(preferences_cls)
+    prefs = preferences_cls()
+    context.preferences.addons[addon_package] = types.SimpleNamespace(preferences=prefs, module=addon_package)
+    return prefs
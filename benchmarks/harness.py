@@ -0,0 +1,70 @@
+"""基准测试公用工具：加载插件、生成模拟的插件面板"""
+import importlib.util
+import os
+import sys
+
+import fake_bpy
+
+ADDON_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_PACKAGE = "addon_manager"
+
+bpy = fake_bpy.install()
+
+
+def load_addon():
+    """以 ADDON_PACKAGE 为包名导入插件并创建其偏好设置"""
+    spec = importlib.util.spec_from_file_location(
+        ADDON_PACKAGE,
+        os.path.join(ADDON_ROOT, "__init__.py"),
+        submodule_search_locations=[ADDON_ROOT],
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_PACKAGE] = addon
+    spec.loader.exec_module(addon)
+    from addon_manager import preferences
+    fake_bpy.attach_preferences(ADDON_PACKAGE, preferences.ADDONMANAGER_preferences)
+    return addon
+
+
+def _draw(self, context):
+    pass
+
+
+def make_panels(count, panels_per_category=10, children_per_parent=3):
+    """生成并注册 count 个 N 面板类
+
+    每个类别属于一个模拟插件，类别内的面板按 children_per_parent 个子面板挂在父面板下。
+    """
+    panels = []
+    for i in range(count):
+        group = i // panels_per_category
+        idname = f"VIEW3D_PT_bench_{i}"
+        attrs = {
+            'bl_idname': idname,
+            'bl_label': f"Bench Panel {i}",
+            'bl_space_type': 'VIEW_3D',
+            'bl_region_type': 'UI',
+            'bl_category': f"Bench {group:05d}",
+            'draw': _draw,
+            '__module__': f"bench_addon_{group}",
+        }
+        offset = i % panels_per_category
+        if offset % (children_per_parent + 1):
+            parent = i - offset % (children_per_parent + 1)
+            attrs['bl_parent_id'] = f"VIEW3D_PT_bench_{parent}"
+        panel_cls = type(idname, (bpy.types.Panel,), attrs)
+        bpy.utils.register_class(panel_cls)
+        panels.append(panel_cls)
+    return panels
+
+
+def run_timers(skip=()):
+    """执行插件注册的定时器（skip 中的定时器不执行并移出队列）"""
+    timers = bpy.app.timers
+    timers.pending = [func for func in timers.pending if func not in skip]
+    while timers.pending:
+        current, timers.pending = timers.pending, []
+        for func in current:
+            if func in skip:
+                continue
+            func()
@@ -0,0 +1,184 @@
+"""无 Blender 环境下的性能基准
+
+用法:
+    python benchmarks/run_benchmarks.py [--sizes 100 1000 10000 50000]
+        [--register-cost 0.00002] [--output bench.json] [--compare old.json]
+
+每个规模在独立的子进程中运行，使用 fake_bpy 模拟 bpy。
+结果以 JSON 输出，可用 --compare 与之前版本的结果对比。
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+SEARCH_TEXT = "cat01"
+
+
+def _timed(func):
+    import fake_bpy
+    fake_bpy.reset_counters()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    result = {'seconds': seconds}
+    result.update(fake_bpy.counters)
+    return result
+
+
+def run_size(size, register_cost, switches):
+    """在当前进程中运行一个规模的基准"""
+    sys.path.insert(0, HERE)
+    import fake_bpy
+    import harness
+
+    addon = harness.load_addon()
+    harness.make_panels(size)
+    fake_bpy.config['register_cost'] = register_cost
+
+    from addon_manager import panel_index, stats, ui
+    bpy = harness.bpy
+    scene = bpy.context.scene
+
+    def then_timers(func):
+        # 操作之后处理本轮排队的定时器（如合并后的重绘），计入同一次计时
+        def run():
+            func()
+            harness.run_timers(skip=(panel_index.sync_timer,))
+        return run
+
+    timings = {}
+    addon.register()
+    timings['startup'] = _timed(lambda: harness.run_timers(skip=(panel_index.sync_timer,)))
+    timings['scan_available_categories'] = _timed(
+        then_timers(lambda: bpy.ops.addonmanager.scan_available_categories()))
+    timings['refresh_categories'] = _timed(then_timers(lambda: bpy.ops.addonmanager.refresh_categories()))
+
+    # 有选中类别时刷新：选择变化合并为一次切换，计数器中的注册/重绘次数应只有一轮
+    scene.addon_manager_category_index = 0
+    harness.run_timers(skip=(panel_index.sync_timer,))
+    timings['refresh_with_selection'] = _timed(then_timers(lambda: bpy.ops.addonmanager.refresh_categories()))
+    scene.addon_manager_category_index = -1
+    harness.run_timers(skip=(panel_index.sync_timer,))
+
+    def type_search():
+        # 逐个字符输入搜索词，每次按键为一轮事件
+        for length in range(1, len(SEARCH_TEXT) + 1):
+            scene.addon_manager_search_term = SEARCH_TEXT[:length]
+            harness.run_timers(skip=(panel_index.sync_timer,))
+        scene.addon_manager_search_term = ""
+        harness.run_timers(skip=(panel_index.sync_timer,))
+
+    timings['search_typing'] = _timed(type_search)
+
+    category_count = len(scene.addon_manager_categories)
+    step = max(1, category_count // switches)
+    indices = list(range(0, category_count, step))[:switches]
+
+    def switch_all():
+        for index in indices:
+            scene.addon_manager_category_index = index
+            harness.run_timers(skip=(panel_index.sync_timer,))
+
+    switch = _timed(switch_all)
+    switch['switches'] = len(indices)
+    switch['seconds_per_switch'] = switch['seconds'] / max(1, len(indices))
+    timings['update_managed_panels'] = switch
+    timings['restore_panels'] = _timed(lambda: ui.restore_panels(force=True))
+    addon.unregister()
+
+    # 第二次启动：命中磁盘扫描缓存
+    addon.register()
+    timings['startup_cached'] = _timed(lambda: harness.run_timers(skip=(panel_index.sync_timer,)))
+    addon.unregister()
+
+    return {
+        'panels': size,
+        'categories': category_count,
+        'timings': timings,
+        'stats': {name: op_stats.as_dict() for name, op_stats in stats.last_stats.items()},
+    }
+
+
+def _addon_version():
+    path = os.path.join(os.path.dirname(HERE), "__init__.py")
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if '"version"' in line:
+                return line.split(':', 1)[1].strip().rstrip(',')
+    return None
+
+
+def compare(results, baseline):
+    """打印与之前结果相比的耗时比值"""
+    old = {entry['panels']: entry for entry in baseline.get('results', [])}
+    for entry in results['results']:
+        previous = old.get(entry['panels'])
+        if previous is None:
+            continue
+        for name, timing in entry['timings'].items():
+            old_timing = previous['timings'].get(name)
+            if not old_timing or not old_timing['seconds']:
+                continue
+            ratio = timing['seconds'] / old_timing['seconds']
+            flag = "  <-- slower" if ratio > 1.2 else ""
+            print(f"{entry['panels']:>6} {name:<28} {old_timing['seconds']:.4f}s -> {timing['seconds']:.4f}s ({ratio:.2f}x){flag}",
+                  file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--register-cost', type=float, default=0.00002,
+                        help="每次 register_class/unregister_class 模拟的耗时（秒）")
+    parser.add_argument('--switches', type=int, default=20, help="update_managed_panels 的切换次数")
+    parser.add_argument('--output', help="把 JSON 结果写入文件（默认输出到标准输出）")
+    parser.add_argument('--compare', help="与之前保存的 JSON 结果对比")
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child is not None:
+        # 子进程：插件自身的 print 输出到 stderr，结果输出到 stdout
+        real_stdout = sys.stdout
+        sys.stdout = sys.stderr
+        result = run_size(args.child, args.register_cost, args.switches)
+        json.dump(result, real_stdout)
+        real_stdout.flush()
+        return 0
+
+    results = {
+        'addon_version': _addon_version(),
+        'python': platform.python_version(),
+        'register_cost': args.register_cost,
+        'results': [],
+    }
+    for size in args.sizes:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', str(size),
+             '--register-cost', str(args.register_cost), '--switches', str(args.switches)],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+        entry = json.loads(proc.stdout)
+        results['results'].append(entry)
+        summary = ", ".join(f"{name} {timing['seconds']:.4f}s" for name, timing in entry['timings'].items())
+        print(f"{size} panels: {summary}", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
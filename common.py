@@ -1,17 +1,253 @@
+import bisect
 import bpy
+import os
+import weakref
+from contextlib import contextmanager
 
 # 共享常量
 ADDON_NAME = "Addon Manager"
 PANEL_CATEGORY = "Addon Mgr"
 
-# 存储原始类别和当前管理的面板
+# 存储原始类别和当前管理的面板（面板 ID -> ManagedPanel）
 original_categories = {}
 currently_managed_panels = set()
+# 类别 -> 面板 ID 集合的反向索引，与 original_categories 保持一致
+category_panels = {}
+# 跳转搜索的枚举项缓存（Blender 要求 Python 持有枚举项字符串的引用）
+_panel_search_items = None
+# 有面板类被回收后置为 True，下次访问前清理失效记录
+_has_dead_entries = False
+# 类别列表的版本号：列表项增删或收藏状态变化时递增，供 UIList 过滤缓存判断是否失效
+category_list_generation = 0
+# 偏好设置中可排除类别列表的版本号：列表项增删时递增，供分页视图缓存判断是否失效
+available_categories_generation = 0
+
+def _on_panel_class_collected(ref):
+    global _has_dead_entries
+    _has_dead_entries = True
+
+class ManagedPanel:
+    """被管理面板的记录
+
+    只弱引用面板类：插件被禁用或重新加载后，旧的类可以被回收，
+    失效的记录在下次访问时清理。
+    """
+    __slots__ = ('_cls_ref', 'idname', 'label', 'parent_id', 'module', 'original_category')
+
+    def __init__(self, panel_cls, idname, category):
+        self._cls_ref = weakref.ref(panel_cls, _on_panel_class_collected)
+        self.idname = idname
+        self.label = getattr(panel_cls, 'bl_label', "") or idname
+        self.parent_id = getattr(panel_cls, 'bl_parent_id', "")
+        self.module = getattr(panel_cls, '__module__', "")
+        self.original_category = category
+
+    @property
+    def cls(self):
+        """面板类，已被回收时为 None"""
+        return self._cls_ref()
+
+    def __repr__(self):
+        return f"<ManagedPanel {self.idname} [{self.original_category}]>"
+
+def bump_available_generation():
+    """标记可排除类别列表的内容已变化"""
+    global available_categories_generation
+    available_categories_generation += 1
+
+def bump_category_generation():
+    """标记类别列表内容已变化"""
+    global category_list_generation
+    category_list_generation += 1
+
+def on_category_item_changed(self, context):
+    """类别列表项属性的更新回调"""
+    if _defer_effect('generation'):
+        return
+    bump_category_generation()
+
+# --- 批量操作 ---
+# 批量操作期间属性的更新回调只记录需要的效果，退出最外层时每种效果只执行一次
+_bulk_depth = 0
+_bulk_effects = set()
+_bulk_suppressed = 0
+
+def _defer_effect(effect):
+    """处于批量操作中时记录效果并返回 True，调用方应直接返回"""
+    global _bulk_suppressed
+    if not _bulk_depth:
+        return False
+    _bulk_effects.add(effect)
+    _bulk_suppressed += 1
+    return True
+
+@contextmanager
+def bulk_update(op_stats=None):
+    """暂停更新回调，退出时统一应用被推迟的效果
+
+    Args:
+        op_stats: 可选的统计对象，记录被合并的回调次数和应用效果的耗时
+    """
+    global _bulk_depth, _bulk_suppressed
+    _bulk_depth += 1
+    try:
+        yield
+    finally:
+        _bulk_depth -= 1
+        if _bulk_depth == 0:
+            effects = set(_bulk_effects)
+            _bulk_effects.clear()
+            suppressed, _bulk_suppressed = _bulk_suppressed, 0
+            if op_stats is not None:
+                op_stats.set('suppressed_updates', suppressed)
+                with op_stats.phase('apply_pending'):
+                    _apply_bulk_effects(effects)
+            else:
+                _apply_bulk_effects(effects)
+
+def _apply_bulk_effects(effects):
+    if 'exclusions' in effects:
+        invalidate_excluded_categories()
+    if 'additional' in effects:
+        load_additional_excluded_from_preferences()
+    if 'generation' in effects:
+        bump_category_generation()
+    if 'switch' in effects:
+        cancel_pending_switch()
+        apply_managed_panels(bpy.context)
+    if 'redraw' in effects:
+        from . import redraw
+        redraw.request()
+
+def add_panel_entry(panel_idname, panel_cls, category):
+    """记录面板的原始类别，同时更新反向索引"""
+    original_categories[panel_idname] = ManagedPanel(panel_cls, panel_idname, category)
+    category_panels.setdefault(category, set()).add(panel_idname)
+    _invalidate_panel_search_items()
+
+def remove_panel_entry(panel_idname):
+    """移除面板记录，返回其原始类别（不存在时返回 None）"""
+    entry = original_categories.pop(panel_idname, None)
+    if entry is None:
+        return None
+    _invalidate_panel_search_items()
+    category = entry.original_category
+    panel_ids = category_panels.get(category)
+    if panel_ids is not None:
+        panel_ids.discard(panel_idname)
+        if not panel_ids:
+            del category_panels[category]
+    return category
+
+def clear_panel_entries():
+    """清空面板记录和反向索引"""
+    global _has_dead_entries
+    original_categories.clear()
+    category_panels.clear()
+    _has_dead_entries = False
+    _invalidate_panel_search_items()
+
+def prune_dead_entries():
+    """移除面板类已被回收的记录
+
+    Returns:
+        set: 受影响的类别
+    """
+    global _has_dead_entries
+    if not _has_dead_entries:
+        return set()
+    _has_dead_entries = False
+    dead = [panel_idname for panel_idname, entry in original_categories.items() if entry.cls is None]
+    touched_categories = set()
+    for panel_idname in dead:
+        touched_categories.add(remove_panel_entry(panel_idname))
+        currently_managed_panels.discard(panel_idname)
+    return touched_categories
+
+def has_dead_entries():
+    return _has_dead_entries
+
+def get_panel_entry(panel_idname):
+    """面板的记录，不存在或面板类已被回收时返回 None"""
+    entry = original_categories.get(panel_idname)
+    if entry is None or entry.cls is None:
+        return None
+    return entry
+
+def _invalidate_panel_search_items():
+    global _panel_search_items
+    _panel_search_items = None
+
+def get_panel_search_items():
+    """跳转搜索的枚举项列表：(面板 ID, "标题 [类别]", 面板 ID)
+
+    由面板记录中的标题生成，记录变化前重复使用同一个列表。
+    """
+    global _panel_search_items
+    prune_dead_entries()
+    if _panel_search_items is None:
+        entries = []
+        for panel_idname, entry in original_categories.items():
+            category = entry.original_category
+            entries.append((entry.label.lower(), category, panel_idname, f"{entry.label} [{category}]"))
+        entries.sort()
+        _panel_search_items = [(panel_idname, text, panel_idname)
+                               for _, _, panel_idname, text in entries]
+    return _panel_search_items
+
+def find_panel_category(panel_idname):
+    """面板所属的原始类别，不在索引中时返回 None"""
+    entry = get_panel_entry(panel_idname)
+    return entry.original_category if entry else None
 
 # 共享函数
 def update_managed_panels(self, context):
     """当类别选择变化时，更新面板的 bl_category"""
+    if _defer_effect('switch'):
+        return
+    if _is_switch_debounced():
+        # 防抖模式：只记录变化，静默期结束后由定时器应用最终选择
+        if bpy.app.timers.is_registered(_apply_pending_switch):
+            bpy.app.timers.unregister(_apply_pending_switch)
+        bpy.app.timers.register(_apply_pending_switch, first_interval=_get_switch_delay())
+        return
+    apply_managed_panels(context)
+
+def _is_switch_debounced():
+    try:
+        from . import preferences
+        prefs = preferences.get_preferences()
+        return bool(prefs and getattr(prefs, "debounce_category_switch", False))
+    except Exception:
+        return False
+
+def _get_switch_delay():
+    try:
+        from . import preferences
+        return preferences.get_preferences().debounce_delay
+    except Exception:
+        return 0.2
+
+def _apply_pending_switch():
+    """防抖定时器回调：应用当前（最终）选中的类别"""
+    try:
+        apply_managed_panels(bpy.context)
+    except Exception as e:
+        print(f"Error applying category switch: {e}")
+    return None
+
+def cancel_pending_switch():
+    """取消尚未应用的类别切换"""
+    if bpy.app.timers.is_registered(_apply_pending_switch):
+        bpy.app.timers.unregister(_apply_pending_switch)
+
+def apply_managed_panels(context):
+    """按当前选中的类别移动面板"""
     print("Category selection changed, updating managed panels...")
+    from . import stats
+    prune_dead_entries()
+    switch_stats = stats.begin('switch')
+    switch_stats.phase_start('collect')
     scene = context.scene
     
     # 获取目标类别（管理器面板的类别）
@@ -23,76 +259,365 @@ def update_managed_panels(self, context):
 
     panels_to_make_visible = set()
     if selected_category_name:
-        # 查找所有原始类别是选中类别的面板 ID
-        for pid, data in original_categories.items():
-            if data['original_category'] == selected_category_name:
-                panels_to_make_visible.add(pid)
+        # 通过反向索引直接取得该类别的面板 ID
+        panels_to_make_visible.update(category_panels.get(selected_category_name, ()))
 
     panels_to_hide = currently_managed_panels - panels_to_make_visible
     panels_to_show = panels_to_make_visible - currently_managed_panels
 
-    # 隐藏不再需要的面板 (恢复原始类别)
+    # 隐藏不再需要的面板 (恢复原始类别) 并显示新选中的面板，合并为一批移动
+    from .panel_moves import PanelMoveTransaction
+    transaction = PanelMoveTransaction()
     for panel_idname in panels_to_hide:
-        if panel_idname in original_categories:
-            panel_cls = original_categories[panel_idname]['class']
-            original_cat = original_categories[panel_idname]['original_category']
-            try:
-                bpy.utils.unregister_class(panel_cls)
-                panel_cls.bl_category = original_cat
-                bpy.utils.register_class(panel_cls)
-                #print(f"Moved panel {panel_idname} back to category '{original_cat}'")
-            except Exception as e:
-                pass
-                #print(f"Error moving panel {panel_idname} back: {e}")
+        entry = get_panel_entry(panel_idname)
+        if entry is not None:
+            transaction.add(panel_idname, entry.cls, entry.original_category)
         else:
              print(f"Warning: Cannot find original data for panel {panel_idname} to hide.")
 
-    # 显示新选中的面板 (设置目标类别)
     for panel_idname in panels_to_show:
-         if panel_idname in original_categories:
-            panel_cls = original_categories[panel_idname]['class']
-            try:
-                bpy.utils.unregister_class(panel_cls)
-                panel_cls.bl_category = target_category
-                bpy.utils.register_class(panel_cls)
-                #print(f"Moved panel {panel_idname} to category '{target_category}'")
-            except Exception as e:
-                pass
-                #print(f"Error moving panel {panel_idname} to manager: {e}")
+         entry = get_panel_entry(panel_idname)
+         if entry is not None:
+            transaction.add(panel_idname, entry.cls, target_category)
          else:
              print(f"Warning: Cannot find original data for panel {panel_idname} to show.")
 
-    # 更新当前管理的面板集合
-    currently_managed_panels.clear()
-    currently_managed_panels.update(panels_to_make_visible)
+    # 离开管理器的面板先撤销耗时分析包装和绘制预算，再随本批移动重新注册；
+    # 移入的面板在注册前应用绘制预算
+    from . import profiler, draw_budget
+    for panel_idname in panels_to_hide:
+        profiler.unwrap_panel(panel_idname)
+        draw_budget.restore_panel(panel_idname)
+    over_budget = draw_budget.apply(panels_to_show)
+    switch_stats.phase_end('collect')
 
-    # 请求 UI 刷新
-    for window in context.window_manager.windows:
-        for area in window.screen.areas:
-            if area.type == 'VIEW_3D':
-                area.tag_redraw()
-                break
+    with switch_stats.phase('move'):
+        committed = transaction.commit()
+    if committed:
+        # 更新当前管理的面板集合：本批实际移入的面板和原本就在管理器中的面板；
+        # 提交成功时 errors 中只有因类已注销而被跳过的移动，这些面板不算在内
+        skipped = {panel_idname for panel_idname, message in transaction.errors}
+        currently_managed_panels.clear()
+        currently_managed_panels.update((panels_to_make_visible - skipped) & original_categories.keys())
+    else:
+        print(f"Failed to switch to category '{selected_category_name}': {transaction.errors[-1][1]}")
+    # 绘制耗时分析：只包装当前管理中的面板
+    draw_budget.sync()
+    profiler.sync()
 
-# 添加一个函数来获取排除的类别
-def get_excluded_categories():
-    """从偏好设置中获取排除的类别列表"""
+    # 请求 UI 刷新（合并到本轮结束时处理）
+    from . import redraw
+    with switch_stats.phase('redraw'):
+        redraw.request()
+
+    switch_stats.set('category', selected_category_name)
+    switch_stats.set('panels_hidden', len(panels_to_hide))
+    switch_stats.set('panels_shown', len(panels_to_show))
+    switch_stats.set('panels_moved', len(transaction.moved))
+    switch_stats.set('move_errors', len(transaction.errors))
+    switch_stats.set('over_budget', len(over_budget))
+    switch_stats.finish()
+
+def reset_managed_panels(panel_ids=None, entries=None):
+    """把当前管理的面板移回原始类别
+
+    Args:
+        panel_ids: 只复位这些面板（默认全部当前管理的面板）
+        entries: 查找面板记录用的映射（默认 original_categories）
+
+    Returns:
+        tuple: (复位的面板数, 出错数)
+    """
+    from .panel_moves import PanelMoveTransaction
+    from . import profiler, draw_budget
+    prune_dead_entries()
+    if panel_ids is None:
+        panel_ids = list(currently_managed_panels)
+        profiler.unwrap_all()
+        draw_budget.restore_all()
+    else:
+        for panel_idname in panel_ids:
+            profiler.unwrap_panel(panel_idname)
+            draw_budget.restore_panel(panel_idname)
+    if entries is None:
+        entries = original_categories
+    transaction = PanelMoveTransaction()
+    for panel_idname in panel_ids:
+        entry = entries.get(panel_idname)
+        if entry is not None and entry.cls is not None:
+            panel_cls = entry.cls
+
+            registered_cls = getattr(bpy.types, panel_idname, None)
+            if registered_cls == panel_cls and getattr(panel_cls, 'bl_category', None) == PANEL_CATEGORY:
+                transaction.add(panel_idname, panel_cls, entry.original_category)
+        else:
+            #print(f"Warning: Cannot find original data for panel {panel_idname} during reset. Removing from tracking.")
+            pass
+        currently_managed_panels.discard(panel_idname)
+
+    error_count = 0
+    if not transaction.commit(drop_failed=True) or transaction.errors:
+        error_count = len(transaction.errors)
+    return len(transaction.moved), error_count
+
+def register_sidebar_panels(records, core_tabs, op_stats=None):
+    """从面板索引中挑出需要管理的 N 面板并记录其原始类别
+
+    Args:
+        records: 面板索引记录
+        core_tabs: 排除匹配器（ExclusionMatcher）
+        op_stats: 可选的统计对象，写入各项计数
+
+    Returns:
+        set: 找到的类别
+    """
+    found_categories = set()
+    registered_panels_count = 0
+    skipped_unregistered = 0
+    skipped_missing_attr = 0
+    skipped_core_tab = 0
+    panel_count = 0
+
+    for record in records:
+        panel_count += 1
+        if not record.has_required_attrs:
+            skipped_missing_attr += 1
+            continue
+
+        if record.is_sidebar:
+            category = record.category
+            panel_idname = record.idname
+            
+            if not category or core_tabs.is_excluded(category, record.cls.__module__):
+                skipped_core_tab += 1
+                continue
+
+            if record.is_registered:
+                if panel_idname not in original_categories:
+                    add_panel_entry(panel_idname, record.cls, category)
+                    found_categories.add(category)
+                    registered_panels_count += 1
+            else:
+                skipped_unregistered += 1
+
+    #print(f"Scan complete: Found {len(found_categories)} valid categories.")
+    if op_stats is not None:
+        op_stats.set('panel_classes', panel_count)
+        op_stats.set('registered_panels', registered_panels_count)
+        op_stats.set('categories', len(found_categories))
+        op_stats.set('skipped_unregistered', skipped_unregistered)
+        op_stats.set('skipped_missing_attr', skipped_missing_attr)
+        op_stats.set('skipped_core_tab', skipped_core_tab)
+    return found_categories
+
+def fill_category_list(scene, categories, favorites):
+    """按名称顺序填充场景的类别列表，并取消当前选择"""
+    category_collection = scene.addon_manager_categories
+    for cat_name in sorted(categories):
+        item = category_collection.add()
+        item.name = cat_name
+        if cat_name in favorites:
+            item.is_favorite = True
+    bump_category_generation()
+
+    scene.addon_manager_category_index = -1
+
+def sync_category_list(scene, categories, favorites, keep_selection=True):
+    """按差异同步场景的类别列表：只添加新类别、移除消失的类别
+
+    已有的列表项（含收藏状态）保持不变；keep_selection 为 True 且当前选中的类别
+    仍存在时保持选中，否则取消选择。
+
+    Returns:
+        tuple: (新增数, 移除数)
+    """
+    category_collection = scene.addon_manager_categories
+    selected_category_name = ""
+    if keep_selection and 0 <= scene.addon_manager_category_index < len(category_collection):
+        selected_category_name = category_collection[scene.addon_manager_category_index].name
+
+    # 从后往前移除，避免索引错位
+    existing_names = set()
+    removed_count = 0
+    for index in range(len(category_collection) - 1, -1, -1):
+        name = category_collection[index].name
+        if name in categories and name not in existing_names:
+            existing_names.add(name)
+        else:
+            category_collection.remove(index)
+            removed_count += 1
+
+    new_categories = sorted(categories - existing_names)
+    for cat_name in new_categories:
+        item = category_collection.add()
+        item.name = cat_name
+        if cat_name in favorites:
+            item.is_favorite = True
+
+    if new_categories or removed_count:
+        bump_category_generation()
+
+    # 重新设置选中项：触发 update_managed_panels，把选中类别的面板重新移入管理器
+    scene.addon_manager_category_index = category_collection.find(selected_category_name) if selected_category_name else -1
+    return len(new_categories), removed_count
+
+def collect_available_categories(records):
+    """获取面板索引中所有 N 面板类别（不含管理器自身）"""
+    all_categories = set()
+    for record in records:
+        if record.is_sidebar and record.category:
+            all_categories.add(record.category)
+    all_categories.discard(PANEL_CATEGORY)
+    return all_categories
+
+def sync_available_categories(prefs, categories, excluded):
+    """按差异同步偏好设置中的可排除类别列表
+
+    已有项保留其勾选状态（包括尚未应用的勾选）；新类别按名称顺序插入，
+    勾选状态取自当前排除集合；不再存在的类别被移除。
+
+    Returns:
+        tuple: (新增的类别列表, 移除的类别列表)
+    """
+    collection = prefs.available_categories
+    removed = []
+    names = []
+    seen = set()
+    for index in range(len(collection) - 1, -1, -1):
+        name = collection[index].name
+        if name in categories and name not in seen:
+            seen.add(name)
+            names.append(name)
+        else:
+            removed.append(name)
+            collection.remove(index)
+    names.reverse()
+
+    added = sorted(categories - seen)
+    for cat_name in added:
+        item = collection.add()
+        item.name = cat_name
+        item.exclude = cat_name in excluded
+        # 移动到按名称排序的位置（列表本身按名称有序时）
+        position = bisect.bisect_left(names, cat_name)
+        names.insert(position, cat_name)
+        if position != len(names) - 1:
+            collection.move(len(names) - 1, position)
+
+    if added or removed:
+        bump_available_generation()
+    return added, sorted(removed)
+
+def apply_panel_changes(scene, added, removed):
+    """把面板索引的增量变化应用到 original_categories 和类别列表
+
+    Args:
+        scene: 当前场景
+        added: 新注册的面板记录
+        removed: 被注销的面板记录
+    """
+    if not hasattr(scene, "addon_manager_categories"):
+        return
+    excluded = get_exclusion_matcher()
+    category_collection = scene.addon_manager_categories
+
+    selected_category_name = ""
+    if 0 <= scene.addon_manager_category_index < len(category_collection):
+        selected_category_name = category_collection[scene.addon_manager_category_index].name
+
+    # 移除已注销的面板（包括面板类已被回收的记录）
+    touched_categories = prune_dead_entries()
+    for record in removed:
+        entry = original_categories.get(record.idname)
+        if entry is not None and entry.cls is record.cls:
+            touched_categories.add(remove_panel_entry(record.idname))
+            currently_managed_panels.discard(record.idname)
+
+    # 加入新注册的面板
+    from .panel_moves import PanelMoveTransaction
+    transaction = PanelMoveTransaction()
+    new_categories = set()
+    panels_to_show = []
+    for record in added:
+        if not record.has_required_attrs or not record.is_sidebar:
+            continue
+        category = record.category
+        if not category or excluded.is_excluded(category, record.cls.__module__) or record.idname in original_categories:
+            continue
+        add_panel_entry(record.idname, record.cls, category)
+        new_categories.add(category)
+
+        # 新面板属于当前选中的类别时，直接移入管理器
+        if category == selected_category_name:
+            transaction.add(record.idname, record.cls, PANEL_CATEGORY)
+            panels_to_show.append(record.idname)
+
+    # 移入的面板在注册前应用绘制预算；已注销或被替换的面板随后由 sync 撤销修改
+    from . import profiler, draw_budget
+    draw_budget.apply(panels_to_show)
+    if transaction.commit():
+        currently_managed_panels.update(transaction.moved)
+    else:
+        print(f"Error moving new panels to manager: {transaction.errors[-1][1]}")
+    draw_budget.sync()
+    profiler.sync()
+
+    # 只检查受影响的类别是否已没有面板
+    vanished = {cat for cat in touched_categories if cat not in category_panels}
+
+    existing_names = {item.name for item in category_collection}
+    favorite_cats = get_favorites()
+    for cat_name in sorted(new_categories - existing_names):
+        item = category_collection.add()
+        item.name = cat_name
+        if cat_name in favorite_cats:
+            item.is_favorite = True
+
+    bump_category_generation()
+    if vanished:
+        for index in reversed(range(len(category_collection))):
+            if category_collection[index].name in vanished:
+                category_collection.remove(index)
+        # 保持当前选中项
+        new_index = -1
+        if selected_category_name and selected_category_name not in vanished:
+            new_index = category_collection.find(selected_category_name)
+        if new_index != scene.addon_manager_category_index:
+            scene.addon_manager_category_index = new_index
+
+    print(f"Panel index synced: {len(added)} added, {len(removed)} removed panels")
+
+def _get_favorites_string():
     try:
-        import bpy
         from . import preferences
         prefs = preferences.get_preferences()
-        if prefs and hasattr(prefs, "excluded_categories"):
-            # 分割字符串并去除空白
-            categories = [cat.strip() for cat in prefs.excluded_categories.split(',') if cat.strip()]
-            # 确保管理器自身的类别也被排除
-            if PANEL_CATEGORY not in categories:
-                categories.append(PANEL_CATEGORY)
-            return set(categories)
+        if prefs and hasattr(prefs, "favorite_categories"):
+            return prefs.favorite_categories
     except Exception as e:
-        print(f"Error getting excluded categories: {e}")
-    
-    # 默认排除类别
-    return {"Item", "Tool", "View", "Create", "Relations", "Edit", 
-            "Physics", "Grease Pencil", PANEL_CATEGORY, "Unknown"}
+        print(f"Error reading favorite categories: {e}")
+    return ""
+
+# 后台模式下强制启用插件功能的环境变量
+FORCE_BACKGROUND_ENV = "ADDON_MANAGER_FORCE_BACKGROUND"
+
+def is_headless():
+    """是否以无界面的后台模式运行（blender --background），且没有强制启用
+
+    后台模式下不扫描面板、不移动面板、不请求重绘，也不注册恢复处理器。
+    可通过偏好设置 run_in_background 或环境变量 ADDON_MANAGER_FORCE_BACKGROUND=1 强制启用。
+    """
+    if not bpy.app.background:
+        return False
+    if os.environ.get(FORCE_BACKGROUND_ENV, "").lower() in {"1", "true", "yes"}:
+        return False
+    try:
+        from . import preferences
+        prefs = preferences.get_preferences()
+        if prefs and getattr(prefs, "run_in_background", False):
+            return False
+    except Exception:
+        pass
+    return True
 
 # 添加函数检查是否应该自动恢复
 def should_auto_restore(restore_type='exit'):
@@ -122,58 +647,123 @@ def should_auto_restore(restore_type='exit'):
 # --- 更新函数 (放在 register_properties 前面或开头) ---
 def update_list_filter(self, context):
     """ Simple update function to redraw areas containing the list """
-    # 强制 UI 刷新 (覆盖所有可能包含列表的窗口和区域)
-    # 这是一种比较通用的方法，确保UI更新
-    for window in context.window_manager.windows:
-        for area in window.screen.areas:
-            area.tag_redraw()
-
-def save_favorites_to_preferences():
-    """将当前收藏状态保存到插件偏好设置中"""
+    # 列表只显示在 3D 视图侧边栏中，由重绘调度合并同一轮内的多次按键
+    if _defer_effect('redraw'):
+        return
+    from . import redraw
+    redraw.request()
+
+# --- 收藏 ---
+# 运行时用集合保存收藏的类别；修改时只标记变化，偏好设置中的字符串在本轮结束时合并写入一次
+_favorites = None
+_favorites_dirty = False
+# 正在写入偏好设置（忽略由此触发的更新回调）
+_writing_favorites = False
+
+def _parse_favorites(text):
+    return {cat.strip() for cat in text.split(',') if cat.strip()}
+
+def get_favorites():
+    """收藏的类别集合（首次访问时从偏好设置读取）"""
+    global _favorites
+    if _favorites is None:
+        _favorites = _parse_favorites(_get_favorites_string())
+    return _favorites
+
+def set_favorite(category, favorite):
+    """修改收藏状态，有变化时安排写入偏好设置
+
+    Returns:
+        bool: 收藏状态是否发生变化
+    """
+    favorites = get_favorites()
+    if (category in favorites) == favorite:
+        return False
+    if favorite:
+        favorites.add(category)
+    else:
+        favorites.discard(category)
+    _schedule_favorites_save()
+    return True
+
+def _schedule_favorites_save():
+    global _favorites_dirty
+    _favorites_dirty = True
+    if not bpy.app.timers.is_registered(_favorites_save_timer):
+        bpy.app.timers.register(_favorites_save_timer, first_interval=0.0)
+
+def _favorites_save_timer():
+    flush_favorites()
+    return None
+
+def flush_favorites():
+    """把尚未写入的收藏变化保存到偏好设置（没有变化时不修改偏好设置）"""
+    global _favorites_dirty, _writing_favorites
+    if bpy.app.timers.is_registered(_favorites_save_timer):
+        bpy.app.timers.unregister(_favorites_save_timer)
+    if not _favorites_dirty:
+        return
+    _favorites_dirty = False
     try:
-        import bpy
         from . import preferences
         prefs = preferences.get_preferences()
-        scene = bpy.context.scene
-        
-        if prefs and hasattr(scene, "addon_manager_categories"):
-            # 收集所有收藏的类别
-            favorite_cats = []
-            for item in scene.addon_manager_categories:
-                if item.is_favorite:
-                    favorite_cats.append(item.name)
-            
-            # 保存到偏好设置
-            prefs.favorite_categories = ",".join(favorite_cats)
-            #print(f"已保存 {len(favorite_cats)} 个收藏类别到偏好设置")
+        if prefs and hasattr(prefs, "favorite_categories"):
+            # 尽量保持用户原有的顺序，新收藏追加在末尾
+            current = [cat.strip() for cat in prefs.favorite_categories.split(',') if cat.strip()]
+            kept = [cat for cat in current if cat in _favorites]
+            kept_set = set(kept)
+            value = ",".join(kept + sorted(_favorites - kept_set))
+            if value != prefs.favorite_categories:
+                _writing_favorites = True
+                try:
+                    prefs.favorite_categories = value
+                finally:
+                    _writing_favorites = False
     except Exception as e:
         print(f"保存收藏类别时出错: {e}")
 
+def on_favorite_categories_changed(self, context):
+    """偏好设置 favorite_categories 被用户直接编辑时，同步到运行时集合和类别列表"""
+    global _favorites, _favorites_dirty
+    if _writing_favorites:
+        return
+    _favorites = _parse_favorites(self.favorite_categories)
+    _favorites_dirty = False
+    scene = getattr(context, "scene", None)
+    if scene is None or not hasattr(scene, "addon_manager_categories"):
+        return
+    with bulk_update():
+        for item in scene.addon_manager_categories:
+            favorite = item.name in _favorites
+            if item.is_favorite != favorite:
+                item.is_favorite = favorite
+
 def load_favorites_from_preferences():
-    """从插件偏好设置中加载收藏状态"""
+    """从插件偏好设置中加载收藏状态
+
+    Returns:
+        set: 收藏的类别
+    """
     try:
         import bpy
-        from . import preferences
-        prefs = preferences.get_preferences()
         scene = bpy.context.scene
-        
-        if prefs and hasattr(prefs, "favorite_categories") and hasattr(scene, "addon_manager_categories"):
-            # 解析收藏类别列表
-            favorite_cats = [cat.strip() for cat in prefs.favorite_categories.split(',') if cat.strip()]
-            
-            # 应用到当前类别列表
+        favorite_cats = get_favorites()
+
+        if hasattr(scene, "addon_manager_categories"):
+            # 应用到当前类别列表（逐项修改只触发一次列表更新）
             updated_count = 0
-            for item in scene.addon_manager_categories:
-                if item.name in favorite_cats:
-                    item.is_favorite = True
-                    updated_count += 1
-            
+            with bulk_update():
+                for item in scene.addon_manager_categories:
+                    if item.name in favorite_cats and not item.is_favorite:
+                        item.is_favorite = True
+                        updated_count += 1
+
             #print(f"从偏好设置中加载了 {updated_count} 个收藏类别")
-            return favorite_cats
+        return favorite_cats
     except Exception as e:
         print(f"加载收藏类别时出错: {e}")
     
-    return []
+    return set()
 
 # 存储额外排除的类别
 _additional_excluded_categories = []
@@ -186,6 +776,7 @@ def set_additional_excluded_categories(categories):
     # 确保 PANEL_CATEGORY 始终在排除列表中
     if PANEL_CATEGORY not in _additional_excluded_categories:
         _additional_excluded_categories.append(PANEL_CATEGORY)
+    invalidate_excluded_categories()
     
     # 保存到偏好设置中
     save_additional_excluded_to_preferences()
@@ -218,27 +809,84 @@ def load_additional_excluded_from_preferences():
             # 确保 PANEL_CATEGORY 始终在排除列表中
             if PANEL_CATEGORY not in _additional_excluded_categories:
                 _additional_excluded_categories.append(PANEL_CATEGORY)
+            invalidate_excluded_categories()
     except Exception as e:
         print(f"Error loading additional excluded categories: {e}")
 
+# 编译后的排除集合缓存，只在相关偏好设置变化时失效
+_default_excluded_cache = None
+_excluded_cache = None
+_exclusion_matcher = None
+
+def invalidate_excluded_categories():
+    """丢弃缓存的排除集合，下次获取时重新解析偏好设置"""
+    global _default_excluded_cache, _excluded_cache, _exclusion_matcher
+    _default_excluded_cache = None
+    _excluded_cache = None
+    _exclusion_matcher = None
+
+def on_excluded_categories_changed(self, context):
+    """偏好设置 excluded_categories 的更新回调"""
+    if _defer_effect('exclusions'):
+        return
+    invalidate_excluded_categories()
+
+def on_additional_excluded_changed(self, context):
+    """偏好设置 additional_excluded_categories 的更新回调"""
+    if _defer_effect('additional'):
+        return
+    load_additional_excluded_from_preferences()
+
+def get_default_excluded_categories():
+    """获取默认排除的类别（偏好设置 excluded_categories 解析后的集合）"""
+    global _default_excluded_cache
+    if _default_excluded_cache is None:
+        try:
+            from . import preferences
+            prefs = preferences.get_preferences()
+            if prefs and hasattr(prefs, "excluded_categories"):
+                # 分割字符串并去除空白
+                _default_excluded_cache = frozenset(
+                    cat.strip() for cat in prefs.excluded_categories.split(',') if cat.strip())
+        except Exception as e:
+            print(f"Error getting default excluded categories: {e}")
+            return frozenset()
+    return _default_excluded_cache if _default_excluded_cache is not None else frozenset()
+
+def get_exclusion_matcher():
+    """获取编译后的排除匹配器（精确类别 + 通配符/正则/模块规则），结果会被缓存"""
+    global _exclusion_matcher
+    if _exclusion_matcher is None:
+        from . import exclusion
+        rules_text = ""
+        try:
+            from . import preferences
+            prefs = preferences.get_preferences()
+            rules_text = getattr(prefs, "exclusion_patterns", "") if prefs else ""
+        except Exception as e:
+            print(f"Error getting exclusion patterns: {e}")
+        _exclusion_matcher = exclusion.compile_rules(get_excluded_categories(), rules_text)
+    return _exclusion_matcher
+
 def get_excluded_categories():
-    """从偏好设置中获取排除的类别列表"""
+    """获取生效的排除类别集合（默认排除 + 额外排除 + 管理器自身），结果会被缓存"""
+    global _excluded_cache
+    if _excluded_cache is not None:
+        return _excluded_cache
     try:
-        import bpy
         from . import preferences
         prefs = preferences.get_preferences()
         if prefs and hasattr(prefs, "excluded_categories"):
-            # 分割字符串并去除空白
-            categories = [cat.strip() for cat in prefs.excluded_categories.split(',') if cat.strip()]
+            categories = set(get_default_excluded_categories())
             # 添加额外排除的类别
-            categories.extend([cat for cat in get_additional_excluded_categories() if cat not in categories])
+            categories.update(get_additional_excluded_categories())
             # 确保管理器自身的类别也被排除
-            if PANEL_CATEGORY not in categories:
-                categories.append(PANEL_CATEGORY)
-            return set(categories)
+            categories.add(PANEL_CATEGORY)
+            _excluded_cache = frozenset(categories)
+            return _excluded_cache
     except Exception as e:
         print(f"Error getting excluded categories: {e}")
     
     # 默认排除类别
-    return {"Item", "Tool", "View", "Create", "Relations", "Edit", 
-            "Physics", "Grease Pencil", PANEL_CATEGORY, "Unknown"}
\ No newline at end of file
+    return frozenset({"Item", "Tool", "View", "Create", "Relations", "Edit", 
+            "Physics", "Grease Pencil", PANEL_CATEGORY, "Unknown"})
@@ -0,0 +1,139 @@
+from . import common, profiler
+
+# --- 绘制预算 ---
+# 载入类别时，根据绘制耗时分析测得的耗时，从最便宜的面板开始累加，
+# 超出预算的面板以折叠状态注册（DEFAULT_CLOSED），或由注入的 poll 跳过，直到用户手动展开。
+# 修改前的 bl_options 和 poll 在面板离开管理器或恢复时按原样写回
+
+_MISSING = object()
+
+# 面板 ID -> (面板类, {属性名: 类字典中的原始值或 _MISSING})
+_adjusted = {}
+# 当前被 poll 跳过的面板 ID
+_suppressed = set()
+
+
+def get_budget():
+    """返回 (预算秒数, 模式)，未启用时预算为 0"""
+    try:
+        from . import preferences
+        prefs = preferences.get_preferences()
+        return prefs.draw_budget_ms / 1000.0, prefs.draw_budget_mode
+    except Exception:
+        return 0.0, 'COLLAPSE'
+
+
+def is_enabled():
+    return get_budget()[0] > 0
+
+
+def select_over_budget(panel_ids, budget):
+    """按耗时从低到高累加，返回累计超出预算的面板 ID（没有测量数据的面板不计入）"""
+    costs = []
+    for panel_idname in panel_ids:
+        cost = profiler.get_draw_cost(panel_idname)
+        if cost is not None:
+            costs.append((cost, panel_idname))
+    costs.sort()
+    total = 0.0
+    over_budget = []
+    for cost, panel_idname in costs:
+        total += cost
+        if total > budget:
+            over_budget.append(panel_idname)
+    return over_budget
+
+
+def _make_poll(panel_idname, original):
+    def poll(cls, context):
+        if panel_idname in _suppressed:
+            return False
+        return original(context) if original is not None else True
+    return classmethod(poll)
+
+
+def _adjust(panel_idname, panel_cls, mode):
+    data = _adjusted.get(panel_idname)
+    if data is not None:
+        if data[0] is panel_cls:
+            return
+        # 同名的新类（插件重载）：先撤销对旧类的修改
+        restore_panel(panel_idname)
+    if mode == 'SKIP':
+        originals = {'poll': panel_cls.__dict__.get('poll', _MISSING)}
+        panel_cls.poll = _make_poll(panel_idname, getattr(panel_cls, 'poll', None))
+        _suppressed.add(panel_idname)
+    else:
+        originals = {'bl_options': panel_cls.__dict__.get('bl_options', _MISSING)}
+        panel_cls.bl_options = set(getattr(panel_cls, 'bl_options', ())) | {'DEFAULT_CLOSED'}
+    _adjusted[panel_idname] = (panel_cls, originals)
+
+
+def apply(panel_ids):
+    """为即将移入管理器的面板应用预算（需在重新注册之前调用，DEFAULT_CLOSED 才会生效）
+
+    Returns:
+        list: 被折叠或跳过的面板 ID
+    """
+    budget, mode = get_budget()
+    if budget <= 0:
+        return []
+    over_budget = select_over_budget(panel_ids, budget)
+    for panel_idname in over_budget:
+        entry = common.get_panel_entry(panel_idname)
+        if entry is not None:
+            _adjust(panel_idname, entry.cls, mode)
+    return over_budget
+
+
+def restore_panel(panel_idname):
+    """把面板的 bl_options / poll 恢复为修改前的原样"""
+    _suppressed.discard(panel_idname)
+    data = _adjusted.pop(panel_idname, None)
+    if data is None:
+        return
+    panel_cls, originals = data
+    for attr, original in originals.items():
+        try:
+            if original is _MISSING:
+                delattr(panel_cls, attr)
+            else:
+                setattr(panel_cls, attr, original)
+        except Exception as e:
+            print(f"Error restoring {attr} of panel {panel_idname}: {e}")
+
+
+def restore_all():
+    for panel_idname in list(_adjusted):
+        restore_panel(panel_idname)
+
+
+def _is_current(panel_idname, panel_cls):
+    """修改过的类是否仍是管理器记录中的那个（同名类被重载后不再是）"""
+    entry = common.get_panel_entry(panel_idname)
+    return entry is not None and entry.cls is panel_cls
+
+
+def sync(managed_panels=None):
+    """恢复不再被管理或已被同名新类替换的面板"""
+    if managed_panels is None:
+        managed_panels = common.currently_managed_panels
+    for panel_idname, (panel_cls, originals) in list(_adjusted.items()):
+        if panel_idname not in managed_panels or not _is_current(panel_idname, panel_cls):
+            restore_panel(panel_idname)
+
+
+def unskip(panel_idname):
+    """用户展开被跳过的面板：之后照常绘制"""
+    _suppressed.discard(panel_idname)
+
+
+def get_skipped():
+    """当前被跳过的面板记录（按标题排序）"""
+    entries = []
+    for panel_idname in _suppressed:
+        entry = common.get_panel_entry(panel_idname)
+        if entry is not None and entry.cls is _adjusted[panel_idname][0]:
+            entries.append(entry)
+    entries.sort(key=lambda entry: entry.label.lower())
+    return entries
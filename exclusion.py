@@ -0,0 +1,145 @@
+import fnmatch
+import re
+
+# --- 排除规则 ---
+# 规则写法（逗号分隔）：
+#   Tool              精确匹配类别名
+#   *Tools*           通配符（glob）匹配类别名
+#   ^Studio_.*        以 ^ 开头或以 re: 为前缀的规则按正则表达式搜索类别名（只有 ^ 锚定开头）
+#   module:studio_*   匹配面板所属插件的包名或完整模块名（cls.__module__），同样支持通配符和 re:；
+#                     扩展（Blender 4.2+，模块名形如 bl_ext.<仓库>.<包名>.ui）按 <包名> 匹配
+# 所有规则编译成一个匹配器，判断结果按 (类别, 模块) 缓存
+
+GLOB_CHARS = set("*?[")
+EXTENSION_PREFIX = "bl_ext."
+
+
+def addon_package(module):
+    """从面板类的模块名取得所属插件的包名
+
+    传统插件取顶层包名；扩展的模块名为 bl_ext.<仓库>.<包名>...，去掉 bl_ext.<仓库>. 前缀
+    """
+    if module.startswith(EXTENSION_PREFIX):
+        parts = module.split('.', 3)
+        if len(parts) >= 3:
+            return parts[2]
+    return module.split('.', 1)[0]
+
+
+def parse_rules(text):
+    """把逗号分隔的规则字符串拆分为 (目标, 类型, 模式) 列表"""
+    rules = []
+    for raw in text.split(','):
+        rule = raw.strip()
+        if not rule:
+            continue
+        target = 'category'
+        if rule.startswith('module:'):
+            target = 'module'
+            rule = rule[len('module:'):].strip()
+        elif rule.startswith('category:'):
+            rule = rule[len('category:'):].strip()
+        if not rule:
+            continue
+
+        if rule.startswith('re:'):
+            rules.append((target, 'regex', rule[len('re:'):].strip()))
+        elif rule.startswith('^'):
+            rules.append((target, 'regex', rule))
+        elif GLOB_CHARS & set(rule):
+            rules.append((target, 'glob', rule))
+        else:
+            rules.append((target, 'exact', rule))
+    return rules
+
+
+def _combine_globs(patterns):
+    """把通配符规则合并为一个正则（fnmatch.translate 的结果不含反向引用和全局标志，可以安全拼接）"""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def _compile_each(patterns):
+    """逐个编译正则规则，非法的正则会被跳过并提示
+
+    用户写的正则不合并：全局标志（如 (?i)）只能出现在开头，反向引用的编号也会因拼接而改变
+    """
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(re.compile(pattern))
+        except re.error as e:
+            print(f"Invalid exclusion pattern '{pattern}': {e}")
+    return tuple(compiled)
+
+
+def _matches(globs, regexes, text):
+    if globs is not None and globs.match(text) is not None:
+        return True
+    return any(regex.search(text) is not None for regex in regexes)
+
+
+class ExclusionMatcher:
+    """编译后的排除规则
+
+    对类别名可直接使用 `category in matcher`；需要按模块匹配时使用 is_excluded。
+    """
+
+    def __init__(self, exact_categories=(), rules=()):
+        exact = {'category': set(exact_categories), 'module': set()}
+        globs = {'category': [], 'module': []}
+        regexes = {'category': [], 'module': []}
+        for target, kind, pattern in rules:
+            if kind == 'exact':
+                exact[target].add(pattern)
+            elif kind == 'glob':
+                globs[target].append(pattern)
+            else:
+                regexes[target].append(pattern)
+
+        self.exact_categories = frozenset(exact['category'])
+        self.exact_modules = frozenset(exact['module'])
+        self._category_globs = _combine_globs(globs['category'])
+        self._category_regexes = _compile_each(regexes['category'])
+        self._module_globs = _combine_globs(globs['module'])
+        self._module_regexes = _compile_each(regexes['module'])
+        self._category_results = {}
+        self._module_results = {}
+
+    @property
+    def has_module_rules(self):
+        return bool(self.exact_modules or self._module_globs is not None or self._module_regexes)
+
+    def matches_category(self, category):
+        result = self._category_results.get(category)
+        if result is None:
+            result = category in self.exact_categories or _matches(
+                self._category_globs, self._category_regexes, category)
+            self._category_results[category] = result
+        return result
+
+    def matches_module(self, module):
+        if not module or not self.has_module_rules:
+            return False
+        result = self._module_results.get(module)
+        if result is None:
+            # 同时匹配完整模块名和插件包名
+            package = addon_package(module)
+            result = (module in self.exact_modules or package in self.exact_modules
+                      or _matches(self._module_globs, self._module_regexes, module)
+                      or _matches(self._module_globs, self._module_regexes, package))
+            self._module_results[module] = result
+        return result
+
+    def is_excluded(self, category, module=None):
+        """类别或所属模块是否被排除"""
+        return self.matches_category(category) or self.matches_module(module)
+
+    def __contains__(self, category):
+        return self.matches_category(category)
+
+
+def compile_rules(exact_categories, rules_text):
+    """根据精确类别集合和规则字符串编译匹配器"""
+    return ExclusionMatcher(exact_categories, parse_rules(rules_text or ""))
@@ -1,8 +1,8 @@
 import bpy
 import traceback
 from bpy.types import Operator
-from bpy.props import IntProperty
-from . import common, translations
+from bpy.props import IntProperty, BoolProperty, EnumProperty, StringProperty
+from . import common, translations, panel_index, stats, scan_cache, startup, profiler, draw_budget, redraw
 
 # --- 操作符：刷新类别列表 ---
 class ADDONMANAGER_OT_refresh_categories(Operator):
@@ -11,6 +11,19 @@ class ADDONMANAGER_OT_refresh_categories(Operator):
     bl_description = "Scan for N-Panel categories and update the list"
     bl_options = {'REGISTER', 'INTERNAL'}
 
+    rescan: BoolProperty(
+        name="Rescan",
+        description="Walk the panel class tree again instead of using the cached index",
+        default=True,
+        options={'SKIP_SAVE'}
+    )
+    keep_selection: BoolProperty(
+        name="Keep Selection",
+        description="Keep the selected category shown in the manager after refreshing",
+        default=True,
+        options={'SKIP_SAVE'}
+    )
+
     @classmethod
     def poll(cls, context):
         return hasattr(context.scene, "addon_manager_categories")
@@ -18,139 +31,74 @@ class ADDONMANAGER_OT_refresh_categories(Operator):
     def execute(self, context):
         #print("Refreshing Addon Categories and Panel Registry...")
         scene = context.scene
-        manager_category_name = common.PANEL_CATEGORY
+        refresh_stats = stats.begin('refresh')
         
-        favorites = {}
-        favorite_cats = common.load_favorites_from_preferences()
-        for cat in favorite_cats:
-            favorites[cat] = True
-
-        # --- 1. 重置当前管理的面板状态 ---
-        #print("Resetting currently managed panels...")
-        original_categories = common.original_categories
-        currently_managed = common.currently_managed_panels
-
-        
-
-        panels_to_reset = list(currently_managed)
-        reset_count = 0
-        error_count = 0
-
-        for panel_idname in panels_to_reset:
-            if panel_idname in original_categories:
-                panel_data = original_categories[panel_idname]
-                panel_cls = panel_data['class']
-                original_cat = panel_data['original_category']
-
-                if hasattr(bpy.types, panel_idname):
-                    registered_cls = getattr(bpy.types, panel_idname)
-                    if registered_cls == panel_cls and hasattr(panel_cls, 'bl_category') and panel_cls.bl_category == manager_category_name:
-                        try:
-                            bpy.utils.unregister_class(panel_cls)
-                            panel_cls.bl_category = original_cat
-                            bpy.utils.register_class(panel_cls)
-                            reset_count += 1
-                        except Exception as e:
-                            #print(f"Error resetting panel {panel_idname}: {e}")
-                            error_count += 1
-                else:
-                    pass
-
-                currently_managed.discard(panel_idname)
-            else:
-                #print(f"Warning: Cannot find original data for panel {panel_idname} during reset. Removing from tracking.")
-                currently_managed.discard(panel_idname)
-
-        if reset_count > 0 or error_count > 0:
-
-             print(f"Finished resetting panels: {reset_count} reset, {error_count} errors.")
-
-        # --- 2. 清空旧数据 ---
-        category_collection = scene.addon_manager_categories
-        category_collection.clear()
-        original_categories.clear()
-        currently_managed.clear()
-
-        #print("Cleared old categories and panel registry.")
-
-        # --- 3. 扫描所有 Panel 子类 ---
-        found_categories = set()
-        # 从偏好设置中获取排除类别
-        core_tabs = common.get_excluded_categories()
-        #print(f"Using excluded categories from preferences: {core_tabs}")
-
-        all_panel_classes = []
-        def collect_subclasses(cls, collected):
-            if isinstance(cls, type):
-                if cls is not bpy.types.Panel:
-                     if issubclass(cls, bpy.types.Panel):
-                         collected.append(cls)
-                try:
-                    subclasses = cls.__subclasses__()
-                    for subcls in subclasses:
-                         if isinstance(subcls, type):
-                            collect_subclasses(subcls, collected)
-                except TypeError:
-                     pass
-
-        collect_subclasses(bpy.types.Panel, all_panel_classes)
-        #print(f"Scanning {len(all_panel_classes)} potential panel classes...")
-
-        registered_panels_count = 0
-        skipped_unregistered = 0
-        skipped_missing_attr = 0
-        skipped_core_tab = 0
-
-        for panel_cls in all_panel_classes:
-            required_attrs = ['bl_space_type', 'bl_region_type', 'bl_category','draw']
-            if not all(hasattr(panel_cls, attr) for attr in required_attrs):
-                skipped_missing_attr += 1
-                continue
-
-            if panel_cls.bl_space_type == 'VIEW_3D' and panel_cls.bl_region_type == 'UI':
-                category = panel_cls.bl_category
-                panel_idname = getattr(panel_cls, 'bl_idname', panel_cls.__name__)
-                
-                if not category or category in core_tabs:
-                    skipped_core_tab += 1
-                    continue
-
-                is_registered = True
-                if hasattr(panel_cls, 'bl_idname'):
-                    if hasattr(bpy.types, panel_cls.bl_idname):
-                        registered_cls = getattr(bpy.types, panel_cls.bl_idname)
-                        is_registered = (registered_cls == panel_cls)
-                    else:
-                        is_registered = False
-                
-                if is_registered:
-                    if panel_idname not in original_categories:
-                        original_categories[panel_idname] = {
-                            'class': panel_cls,
-                            'original_category': category
-                        }
-                        found_categories.add(category)
-                        registered_panels_count += 1
-                else:
-                    skipped_unregistered += 1
-
-        #print(f"Scan complete: Found {len(found_categories)} valid categories.")
-        #print(f"Registered {registered_panels_count} relevant panels.")
-        #print(f"Skipped: {skipped_unregistered} (unregistered/mismatch), {skipped_missing_attr} (missing attrs), {skipped_core_tab} (core/empty category)")
-
-        # --- 4. 填充类别列表 UI ---
-        sorted_categories = sorted(list(found_categories))
-        for cat_name in sorted_categories:
-            item = category_collection.add()
-            item.name = cat_name
-            if cat_name in favorites:
-                item.is_favorite = True
-
-        scene.addon_manager_category_index = -1
-        currently_managed.clear()
+        favorites = common.load_favorites_from_preferences()
+
+        # 批量操作：期间的选择变化和列表更新只在结束时应用一次，
+        # 面板的移动合并为一次对注册表的遍历
+        with common.bulk_update(refresh_stats):
+            currently_managed = common.currently_managed_panels
+            reset_count, error_count = 0, 0
+
+            # --- 1. 不保留选择时，先把当前管理的面板移回原处 ---
+            # 保留选择时不复位：结束时只移动选择前后有差异的面板
+            if not self.keep_selection:
+                with refresh_stats.phase('reset'):
+                    reset_count, error_count = common.reset_managed_panels()
+
+            # --- 2. 扫描所有 Panel 子类 ---
+            # 从偏好设置中获取排除类别
+            core_tabs = common.get_exclusion_matcher()
+            #print(f"Using excluded categories from preferences: {core_tabs}")
+
+            # 需要时重新遍历类树，否则沿用缓存的索引；
+            # 旧的面板记录此时仍在，管理中的面板按原始类别建立索引
+            with refresh_stats.phase('walk'):
+                if self.rescan:
+                    panel_index.invalidate_index()
+                all_panel_records = panel_index.get_index()
+            #print(f"Scanning {len(all_panel_records)} potential panel classes...")
+
+            # --- 3. 重建面板记录（类别列表按差异同步，不在此清空） ---
+            with refresh_stats.phase('clear'):
+                previous_entries = dict(common.original_categories)
+                common.clear_panel_entries()
+
+            with refresh_stats.phase('filter'):
+                found_categories = common.register_sidebar_panels(all_panel_records, core_tabs, refresh_stats)
+
+            # 不再被管理的面板（已注销或已被排除）移回原处
+            stale = [pid for pid in currently_managed if pid not in common.original_categories]
+            if stale:
+                with refresh_stats.phase('reset'):
+                    stale_reset, stale_errors = common.reset_managed_panels(stale, previous_entries)
+                reset_count += stale_reset
+                error_count += stale_errors
+            previous_entries = None
+
+            if reset_count > 0 or error_count > 0:
+
+                 print(f"Finished resetting panels: {reset_count} reset, {error_count} errors.")
+
+            # --- 4. 同步类别列表 UI（保留已有项和当前选择） ---
+            with refresh_stats.phase('populate'):
+                added_count, removed_count = common.sync_category_list(
+                    scene, found_categories, favorites, keep_selection=self.keep_selection)
+
+        refresh_stats.set('list_added', added_count)
+        refresh_stats.set('list_removed', removed_count)
+        refresh_stats.set('reset_panels', reset_count)
+        refresh_stats.set('reset_errors', error_count)
+        refresh_stats.finish()
+        startup.mark_ready()
+
+        # 完整扫描的结果写入磁盘缓存，供下次启动使用
+        if self.rescan:
+            scan_cache.save()
 
         #print("Refresh complete.")
-        bpy.ops.wm.redraw_timer(type='DRAW_WIN_SWAP', iterations=1)
+        redraw.request()
         return {'FINISHED'}
 
 # --- 操作符：切换收藏状态 ---
@@ -158,7 +106,8 @@ class ADDONMANAGER_OT_toggle_favorite(Operator):
     bl_idname = "addonmanager.toggle_favorite"
     bl_label = "Toggle Category Favorite"
     bl_description = "Mark or unmark this category as a favorite"
-    bl_options = {'REGISTER', 'UNDO'} # UNDO is good practice here
+    # 收藏属于界面偏好，不产生撤销步骤
+    bl_options = {'REGISTER', 'INTERNAL'}
 
     item_index: IntProperty() # 接收要切换的项的索引
 
@@ -179,19 +128,64 @@ class ADDONMANAGER_OT_toggle_favorite(Operator):
             item.is_favorite = not item.is_favorite
             #print(f"Toggled favorite for '{item.name}' to {item.is_favorite}")
             
-            # 保存收藏状态到偏好设置
-            common.save_favorites_to_preferences()
-            # 可能需要强制刷新UI列表区域（如果图标没有立即更新）
-            # 尝试找到包含这个列表的区域并标记重绘
-            for window in context.window_manager.windows:
-                for area in window.screen.areas:
-                    if area.type == 'VIEW_3D': # 或者你的面板所在的其他区域类型
-                       area.tag_redraw()
+            # 更新收藏集合，偏好设置在本轮结束时合并写入
+            common.set_favorite(item.name, item.is_favorite)
+            # 请求重绘包含列表的区域（如果图标没有立即更新）
+            redraw.request()
             return {'FINISHED'}
         else:
             self.report({'WARNING'}, f"Invalid item index: {self.item_index}")
             return {'CANCELLED'}
 
+# --- 操作符：按面板标题跳转 ---
+def _panel_search_items(self, context):
+    return common.get_panel_search_items()
+
+class ADDONMANAGER_OT_jump_to_panel(Operator):
+    bl_idname = "addonmanager.jump_to_panel"
+    bl_label = "Jump to Panel"
+    bl_description = "Search panels by title and show the category they belong to"
+    bl_options = {'REGISTER', 'INTERNAL'}
+    bl_property = "panel"
+
+    panel: EnumProperty(
+        name="Panel",
+        items=_panel_search_items
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return hasattr(context.scene, "addon_manager_categories")
+
+    def invoke(self, context, event):
+        # 搜索直接使用已建立的面板标题索引，不遍历面板类
+        context.window_manager.invoke_search_popup(self)
+        return {'FINISHED'}
+
+    def execute(self, context):
+        scene = context.scene
+        category = common.find_panel_category(self.panel)
+        if category is None:
+            self.report({'WARNING'}, f"Panel not managed: {self.panel}")
+            return {'CANCELLED'}
+
+        categories = scene.addon_manager_categories
+        index = categories.find(category)
+        if index < 0:
+            self.report({'WARNING'}, f"Category not in list: {category}")
+            return {'CANCELLED'}
+
+        with common.bulk_update():
+            # 确保目标类别在列表中可见
+            if scene.addon_manager_search_term:
+                scene.addon_manager_search_term = ""
+            if scene.addon_manager_show_favorites_only and not categories[index].is_favorite:
+                scene.addon_manager_show_favorites_only = False
+
+            # 选中类别会触发 update_managed_panels，把面板移入管理器
+            scene.addon_manager_category_index = index
+        return {'FINISHED'}
+
 # --- 操作符：扫描可用类别 ---
 class ADDONMANAGER_OT_scan_available_categories(Operator):
     bl_idname = "addonmanager.scan_available_categories"
@@ -199,55 +193,90 @@ class ADDONMANAGER_OT_scan_available_categories(Operator):
     bl_description = "扫描所有可用的面板类别"
     bl_options = {'REGISTER', 'INTERNAL'}
 
+    rescan: BoolProperty(
+        name="Rescan",
+        description="Walk the panel class tree again instead of using the cached index",
+        default=True,
+        options={'SKIP_SAVE'}
+    )
+
     def execute(self, context):
         from . import preferences, common
         prefs = preferences.get_preferences()
-        
-        # 清空现有类别
-        prefs.available_categories.clear()
+        scan_stats = stats.begin('scan')
         
         # 获取当前排除的类别
         excluded = common.get_excluded_categories()
         
-        # 扫描所有面板类别
-        all_categories = set()
-        
-        # 收集所有面板子类
-        all_panel_classes = []
-        def collect_subclasses(cls, collected):
-            if isinstance(cls, type):
-                if cls is not bpy.types.Panel:
-                    if issubclass(cls, bpy.types.Panel):
-                        collected.append(cls)
-                try:
-                    subclasses = cls.__subclasses__()
-                    for subcls in subclasses:
-                        if isinstance(subcls, type):
-                            collect_subclasses(subcls, collected)
-                except TypeError:
-                    pass
-        
-        collect_subclasses(bpy.types.Panel, all_panel_classes)
+        # 提取所有类别（使用共享的面板索引）
+        with scan_stats.phase('walk'):
+            if self.rescan:
+                panel_index.invalidate_index()
+            all_panel_records = panel_index.get_index()
+        with scan_stats.phase('filter'):
+            all_categories = common.collect_available_categories(all_panel_records)
         
-        # 提取所有类别
-        for panel_cls in all_panel_classes:
-            if hasattr(panel_cls, 'bl_space_type') and hasattr(panel_cls, 'bl_region_type') and hasattr(panel_cls, 'bl_category'):
-                if panel_cls.bl_space_type == 'VIEW_3D' and panel_cls.bl_region_type == 'UI':
-                    category = panel_cls.bl_category
-                    if category and category != "":
-                        all_categories.add(category)
+        # 与现有列表按差异同步，保留用户已勾选但尚未应用的项
+        with scan_stats.phase('populate'):
+            added, removed = common.sync_available_categories(prefs, all_categories, excluded)
+
+        scan_stats.set('panel_classes', len(all_panel_records))
+        scan_stats.set('categories', len(all_categories))
+        scan_stats.set('added', len(added))
+        scan_stats.set('removed', len(removed))
+        scan_stats.finish()
+        redraw.request(redraw.PREFERENCES)
         
-        # 添加到可用类别列表
-        manager_category = common.PANEL_CATEGORY
-        for cat_name in sorted(all_categories):
-            if cat_name == manager_category:
-                continue
-            item = prefs.available_categories.add()
-            item.name = cat_name
-            # 如果在当前排除列表中，则设置为排除
-            item.exclude = cat_name in excluded
-        
-        #self.report({'INFO'}, f"已扫描到 {len(all_categories)} 个类别")
+        if added or removed:
+            self.report({'INFO'}, f"{len(all_categories)} categories: {len(added)} new, {len(removed)} removed")
+        else:
+            self.report({'INFO'}, f"{len(all_categories)} categories, no changes")
+        return {'FINISHED'}
+
+# --- 操作符：批量勾选可排除类别 ---
+class ADDONMANAGER_OT_select_excludable_categories(Operator):
+    bl_idname = "addonmanager.select_excludable_categories"
+    bl_label = "批量选择类别"
+    bl_description = "勾选或取消勾选所有匹配搜索词的类别（包括其他页）"
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    action: EnumProperty(
+        name="Action",
+        items=[
+            ('SELECT', "Select", "Exclude all matching categories"),
+            ('DESELECT', "Deselect", "Include all matching categories"),
+        ],
+        default='SELECT'
+    )
+
+    def execute(self, context):
+        from . import preferences
+        prefs = preferences.get_preferences()
+        exclude = self.action == 'SELECT'
+        changed = 0
+        for index in preferences.get_exclusion_view(prefs):
+            item = prefs.available_categories[index]
+            if item.exclude != exclude:
+                item.exclude = exclude
+                changed += 1
+        self.report({'INFO'}, f"{changed} categories updated")
+        return {'FINISHED'}
+
+# --- 操作符：可排除类别翻页 ---
+class ADDONMANAGER_OT_change_exclusion_page(Operator):
+    bl_idname = "addonmanager.change_exclusion_page"
+    bl_label = "翻页"
+    bl_description = "显示上一页或下一页类别"
+    bl_options = {'INTERNAL'}
+
+    delta: IntProperty(default=1)
+
+    def execute(self, context):
+        from . import preferences
+        prefs = preferences.get_preferences()
+        visible_count = len(preferences.get_exclusion_view(prefs))
+        page_count = max(1, (visible_count + prefs.exclusion_page_size - 1) // prefs.exclusion_page_size)
+        prefs.exclusion_page = max(0, min(prefs.exclusion_page + self.delta, page_count - 1))
         return {'FINISHED'}
 
 # --- 操作符：应用排除类别设置 ---
@@ -262,7 +291,7 @@ class ADDONMANAGER_OT_apply_excluded_categories(Operator):
         prefs = preferences.get_preferences()
         
         # 获取默认排除的类别
-        default_excluded = [cat.strip() for cat in prefs.excluded_categories.split(',') if cat.strip()]
+        default_excluded = common.get_default_excluded_categories()
         
         # 收集所有被标记为排除的类别
         additional_excluded = []
@@ -270,19 +299,66 @@ class ADDONMANAGER_OT_apply_excluded_categories(Operator):
             if item.exclude and item.name not in default_excluded:
                 additional_excluded.append(item.name)
         
-        # 合并默认排除和额外排除的类别
-        all_excluded = default_excluded + additional_excluded
-        
-        # 更新内部使用的排除类别列表（不修改用户输入的默认排除类别）
-        from . import common
-        common.set_additional_excluded_categories(additional_excluded)
-        
-        # 刷新类别列表
-        bpy.ops.addonmanager.refresh_categories()
+        # 更新排除列表并刷新，期间的偏好设置回调和选择变化合并为一次
+        with common.bulk_update():
+            # 更新内部使用的排除类别列表（不修改用户输入的默认排除类别）
+            common.set_additional_excluded_categories(additional_excluded)
+
+            # 刷新类别列表（排除设置不影响面板类树，沿用缓存的索引）
+            bpy.ops.addonmanager.refresh_categories(rescan=False)
         
         #self.report({'INFO'}, f"已应用 {len(all_excluded)} 个排除类别")
         return {'FINISHED'}
 
+# --- 操作符：导出/清空面板绘制耗时 ---
+class ADDONMANAGER_OT_export_draw_profile(Operator):
+    bl_idname = "addonmanager.export_draw_profile"
+    bl_label = "Export Draw Profile"
+    bl_description = "Save the per-panel draw timings as JSON"
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    filepath: StringProperty(subtype='FILE_PATH')
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'})
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "addon_manager_draw_profile.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        try:
+            count = profiler.export_json(bpy.path.abspath(self.filepath), context.scene.addon_manager_profile_sort)
+        except OSError as e:
+            self.report({'ERROR'}, f"Error exporting draw profile: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Exported draw timings of {count} panels")
+        return {'FINISHED'}
+
+class ADDONMANAGER_OT_clear_draw_profile(Operator):
+    bl_idname = "addonmanager.clear_draw_profile"
+    bl_label = "Clear Draw Profile"
+    bl_description = "Discard the collected per-panel draw timings"
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    def execute(self, context):
+        profiler.clear()
+        return {'FINISHED'}
+
+# --- 操作符：显示被绘制预算跳过的面板 ---
+class ADDONMANAGER_OT_show_skipped_panel(Operator):
+    bl_idname = "addonmanager.show_skipped_panel"
+    bl_label = "Show Panel"
+    bl_description = "Draw this panel even though it is over the draw budget"
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    panel: StringProperty(options={'SKIP_SAVE'})
+
+    def execute(self, context):
+        draw_budget.unskip(self.panel)
+        redraw.request()
+        return {'FINISHED'}
+
 class ADDONMANAGER_OT_change_language(Operator):
     bl_idname = "addonmanager.change_language"
     bl_label = "Change Language"
@@ -296,18 +372,23 @@ class ADDONMANAGER_OT_change_language(Operator):
         if prefs:
             translations.switch_language(prefs.language)
             print(f"语言已切换到: {prefs.language}")
-            # 刷新所有UI区域
-            for window in context.window_manager.windows:
-                for area in window.screen.areas:
-                    area.tag_redraw()
+            # 刷新插件界面所在的区域
+            redraw.request(redraw.VIEW3D)
+            redraw.request(redraw.PREFERENCES)
         return {'FINISHED'}
 # 注册类列表
 classes = (
     ADDONMANAGER_OT_change_language,
     ADDONMANAGER_OT_toggle_favorite,
+    ADDONMANAGER_OT_jump_to_panel,
     ADDONMANAGER_OT_refresh_categories,
     ADDONMANAGER_OT_scan_available_categories,
+    ADDONMANAGER_OT_select_excludable_categories,
+    ADDONMANAGER_OT_change_exclusion_page,
     ADDONMANAGER_OT_apply_excluded_categories,
+    ADDONMANAGER_OT_export_draw_profile,
+    ADDONMANAGER_OT_clear_draw_profile,
+    ADDONMANAGER_OT_show_skipped_panel,
 )
 
 def register():
@@ -0,0 +1,266 @@
+import bpy
+import sys
+from . import common
+
+# --- 面板索引 ---
+# 遍历一次 bpy.types.Panel 子类树，缓存每个面板的记录，
+# 供刷新类别、扫描可用类别等操作共用，避免重复遍历整个类树
+
+class PanelRecord:
+    """单个面板类的扫描记录"""
+    __slots__ = ('cls', 'idname', 'space_type', 'region_type', 'category', 'is_registered', 'has_draw')
+
+    def __init__(self, cls, idname, space_type, region_type, category, is_registered, has_draw):
+        self.cls = cls
+        self.idname = idname
+        self.space_type = space_type
+        self.region_type = region_type
+        self.category = category
+        self.is_registered = is_registered
+        self.has_draw = has_draw
+
+    @property
+    def has_required_attrs(self):
+        """是否具备刷新类别时要求的全部属性"""
+        return (self.space_type is not None and self.region_type is not None
+                and self.category is not None and self.has_draw)
+
+    @property
+    def is_sidebar(self):
+        """是否为 3D 视图 N 面板中的面板"""
+        return self.space_type == 'VIEW_3D' and self.region_type == 'UI'
+
+
+# 缓存的索引：面板类 -> 记录（None 表示需要重新遍历）
+_records = None
+# idname -> 使用该 idname 的记录列表，用于增量更新
+_by_idname = {}
+# 建立/同步索引时 bpy.types 成员名的快照
+_snapshot = None
+# 完整遍历时收集到的未注册记录，下次同步时移出索引
+_stale_records = []
+# 已启用插件模块的快照，变化时（插件被启用、禁用或重新载入）才确认面板类是否被替换
+_addon_snapshot = None
+
+
+def _type_names():
+    """获取 bpy.types 当前成员名的快照"""
+    return set(dir(bpy.types))
+
+
+def _addon_modules():
+    """获取已启用插件模块的快照：(模块名, 模块对象 id, 载入时文件的修改时间)
+
+    插件从磁盘重新载入时 __time__ 会变化，其中的面板类随之被同名新类替换
+    """
+    snapshot = set()
+    for name in bpy.context.preferences.addons.keys():
+        module = sys.modules.get(name)
+        snapshot.add((name, id(module), getattr(module, '__time__', None)))
+    return snapshot
+
+
+def collect_panel_classes():
+    """收集所有 Panel 子类（不含 Panel 本身），每个类只收集一次"""
+    base = bpy.types.Panel
+    collected = []
+    seen = {base}
+    stack = [base]
+    while stack:
+        cls = stack.pop()
+        try:
+            subclasses = cls.__subclasses__()
+        except TypeError:
+            continue
+        # 逆序压栈，保持与递归遍历相同的顺序
+        for subcls in reversed(subclasses):
+            if isinstance(subcls, type) and subcls not in seen:
+                seen.add(subcls)
+                stack.append(subcls)
+        if cls is not base and issubclass(cls, base):
+            collected.append(cls)
+    return collected
+
+
+def _is_registered(panel_cls):
+    """面板类是否就是当前注册在 bpy.types 中的那个类"""
+    if hasattr(panel_cls, 'bl_idname'):
+        registered_cls = getattr(bpy.types, panel_cls.bl_idname, None)
+        return registered_cls == panel_cls
+    return True
+
+
+def make_record(panel_cls):
+    """为面板类生成扫描记录"""
+    idname = getattr(panel_cls, 'bl_idname', panel_cls.__name__)
+    category = getattr(panel_cls, 'bl_category', None)
+
+    # 正在被管理的面板，其 bl_category 已被改为管理器类别，记录原始类别
+    if idname in common.currently_managed_panels and idname in common.original_categories:
+        category = common.original_categories[idname].original_category
+
+    return PanelRecord(
+        panel_cls,
+        idname,
+        getattr(panel_cls, 'bl_space_type', None),
+        getattr(panel_cls, 'bl_region_type', None),
+        category,
+        _is_registered(panel_cls),
+        hasattr(panel_cls, 'draw'),
+    )
+
+
+def _add_record(record):
+    _records[record.cls] = record
+    _by_idname.setdefault(record.idname, []).append(record)
+    if not record.is_registered:
+        _stale_records.append(record)
+
+
+def _drop_record(record):
+    """把记录移出索引，不再持有已注销的面板类"""
+    if _records.get(record.cls) is record:
+        del _records[record.cls]
+    records = _by_idname.get(record.idname)
+    if records is not None:
+        if record in records:
+            records.remove(record)
+        if not records:
+            del _by_idname[record.idname]
+
+
+def build_index():
+    """重新遍历面板类树并缓存结果"""
+    global _records, _snapshot, _addon_snapshot
+    _snapshot = _type_names()
+    _addon_snapshot = _addon_modules()
+    _records = {}
+    _by_idname.clear()
+    _stale_records.clear()
+    for panel_cls in collect_panel_classes():
+        _add_record(make_record(panel_cls))
+    return _records.values()
+
+
+def build_index_from(panel_classes):
+    """用给定的面板类建立索引（例如来自磁盘缓存），不遍历类树"""
+    global _records, _snapshot, _addon_snapshot
+    _snapshot = _type_names()
+    _addon_snapshot = _addon_modules()
+    _records = {}
+    _by_idname.clear()
+    _stale_records.clear()
+    for panel_cls in panel_classes:
+        _add_record(make_record(panel_cls))
+    return _records.values()
+
+
+def get_index():
+    """获取面板索引，尚未建立时遍历一次"""
+    if _records is None:
+        return build_index()
+    return _records.values()
+
+
+def invalidate_index():
+    """丢弃缓存，下次获取时重新遍历"""
+    global _records, _snapshot, _addon_snapshot
+    _records = None
+    _snapshot = None
+    _addon_snapshot = None
+    _by_idname.clear()
+    _stale_records.clear()
+
+
+def iter_sidebar_records():
+    """遍历 3D 视图 N 面板中的面板记录"""
+    for record in get_index():
+        if record.is_sidebar:
+            yield record
+
+
+def sync_index():
+    """对比 bpy.types 快照，只更新新出现、消失或被替换的面板记录
+
+    Returns:
+        tuple: (新注册的记录列表, 被注销的记录列表)
+    """
+    global _snapshot, _addon_snapshot
+    if _records is None:
+        return [], []
+
+    names = _type_names()
+    added_names = names - _snapshot
+    removed_names = _snapshot - names
+    _snapshot = names
+    addons = _addon_modules()
+    addons_changed = addons != _addon_snapshot
+    _addon_snapshot = addons
+
+    added = []
+    removed = []
+
+    # 被注销的面板：标记为未注册，同步结束后移出索引
+    for name in removed_names:
+        for record in _by_idname.get(name, ()):
+            if record.is_registered:
+                record.is_registered = False
+                removed.append(record)
+
+    # 被同名新类替换（例如插件在两次同步之间重载）的面板，成员名不变，只比较名称发现不了。
+    # 只在插件模块或成员名有变化时确认，且只确认管理器记录的面板；空闲时只做成员名对比
+    tracked = common.original_categories if (addons_changed or added_names or removed_names) else {}
+    for name, entry in tracked.items():
+        if name in removed_names or name in added_names:
+            continue
+        panel_cls = entry.cls
+        if panel_cls is None or getattr(bpy.types, name, None) is panel_cls:
+            continue
+        added_names.add(name)
+
+    # 新注册的面板
+    for name in added_names:
+        panel_cls = getattr(bpy.types, name, None)
+        if not isinstance(panel_cls, type) or panel_cls is bpy.types.Panel:
+            continue
+        if not issubclass(panel_cls, bpy.types.Panel):
+            continue
+        record = _records.get(panel_cls)
+        if record is None:
+            record = make_record(panel_cls)
+            _add_record(record)
+        else:
+            record.is_registered = _is_registered(panel_cls)
+        # 同名的旧类（例如插件重载前的类）不再是注册中的那个
+        for other in _by_idname.get(record.idname, ()):
+            if other is not record and other.is_registered:
+                other.is_registered = False
+                removed.append(other)
+        if record.is_registered:
+            added.append(record)
+
+    # 索引不再引用已注销的类，面板记录中的弱引用才能随类一起失效
+    for record in removed:
+        _drop_record(record)
+    for record in _stale_records:
+        if not record.is_registered:
+            _drop_record(record)
+    _stale_records.clear()
+
+    return added, removed
+
+
+def sync_timer():
+    """定时检查插件启用/禁用带来的面板变化，并增量更新类别列表"""
+    from . import preferences
+    interval = 2.0
+    try:
+        prefs = preferences.get_preferences()
+        interval = prefs.sync_interval
+        if prefs.auto_sync_panels:
+            added, removed = sync_index()
+            if added or removed or common.has_dead_entries():
+                common.apply_panel_changes(bpy.context.scene, added, removed)
+    except Exception as e:
+        print(f"Error syncing panel index: {e}")
+    return interval
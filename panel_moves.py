@@ -0,0 +1,132 @@
+import bpy
+
+# --- 面板移动事务 ---
+# 把一组“注销 -> 修改 bl_category -> 重新注册”的操作合并成一批执行：
+# 先按子面板到父面板的顺序全部注销，再统一修改类别，
+# 最后按父面板到子面板的顺序重新注册；任何一步失败都回滚到移动前的状态
+
+class PanelMoveTransaction:
+    """一批面板类别移动"""
+
+    def __init__(self):
+        # idname -> (面板类, 目标类别)
+        self._moves = {}
+        self.errors = []
+        self.moved = []
+
+    def add(self, panel_idname, panel_cls, target_category):
+        """加入一个移动，目标类别与当前类别相同时忽略"""
+        if getattr(panel_cls, 'bl_category', None) == target_category:
+            self._moves.pop(panel_idname, None)
+            return
+        self._moves[panel_idname] = (panel_cls, target_category)
+
+    def __len__(self):
+        return len(self._moves)
+
+    def _depth(self, panel_idname, panel_cls):
+        """面板在父子层级中的深度（顶层面板为 0）"""
+        depth = 0
+        seen = {panel_idname}
+        parent_id = getattr(panel_cls, 'bl_parent_id', "")
+        while parent_id and parent_id not in seen:
+            seen.add(parent_id)
+            depth += 1
+            if parent_id in self._moves:
+                parent_cls = self._moves[parent_id][0]
+            else:
+                parent_cls = getattr(bpy.types, parent_id, None)
+            parent_id = getattr(parent_cls, 'bl_parent_id', "") if parent_cls is not None else ""
+        return depth
+
+    def _ordered(self):
+        """按父面板在前的顺序排列移动"""
+        moves = [(self._depth(pid, cls), pid, cls, target)
+                 for pid, (cls, target) in self._moves.items()]
+        moves.sort(key=lambda move: (move[0], move[1]))
+        return moves
+
+    def commit(self, drop_failed=False):
+        """执行全部移动
+
+        Args:
+            drop_failed: 失败回滚后，去掉出错的面板再重试其余移动（用于恢复面板等需要尽量完成的场景）
+
+        Returns:
+            bool: 全部成功返回 True；失败时已回滚并返回 False，错误见 self.errors
+        """
+        errors = []
+        while True:
+            if self._commit_once():
+                self.errors = errors + self.errors
+                return True
+            errors.extend(self.errors)
+            failed_pid = self.errors[-1][0]
+            if not drop_failed or failed_pid not in self._moves:
+                self._moves.clear()
+                self.errors = errors
+                return False
+            del self._moves[failed_pid]
+
+    def _commit_once(self):
+        self.errors = []
+        self.moved = []
+        if not self._moves:
+            return True
+
+        ordered = self._ordered()
+        unregistered = []
+        old_categories = {}
+
+        # 1. 子面板在前，依次注销
+        for depth, pid, cls, target in reversed(ordered):
+            if getattr(bpy.types, pid, None) is not cls:
+                # 已被其他插件注销或替换，跳过该移动
+                self.errors.append((pid, "panel class is no longer registered"))
+                del self._moves[pid]
+                continue
+            try:
+                bpy.utils.unregister_class(cls)
+            except Exception as e:
+                self.errors.append((pid, str(e)))
+                self._rollback(unregistered, old_categories, [])
+                return False
+            unregistered.append((depth, pid, cls, target))
+
+        # 2. 修改类别
+        for depth, pid, cls, target in unregistered:
+            old_categories[pid] = cls.bl_category
+            cls.bl_category = target
+
+        # 3. 父面板在前，依次重新注册
+        registered = []
+        for move in reversed(unregistered):
+            depth, pid, cls, target = move
+            try:
+                bpy.utils.register_class(cls)
+            except Exception as e:
+                self.errors.append((pid, str(e)))
+                self._rollback(unregistered, old_categories, registered)
+                return False
+            registered.append(move)
+
+        self.moved = [pid for depth, pid, cls, target in registered]
+        self._moves.clear()
+        return True
+
+    def _rollback(self, unregistered, old_categories, registered):
+        """撤销已完成的步骤，恢复移动前的注册状态和类别"""
+        for depth, pid, cls, target in reversed(registered):
+            try:
+                bpy.utils.unregister_class(cls)
+            except Exception as e:
+                print(f"Error rolling back panel {pid}: {e}")
+        for depth, pid, cls, target in unregistered:
+            if pid in old_categories:
+                cls.bl_category = old_categories[pid]
+        for depth, pid, cls, target in reversed(unregistered):
+            try:
+                bpy.utils.register_class(cls)
+            except Exception as e:
+                print(f"Error rolling back panel {pid}: {e}")
+        print(f"Panel move rolled back: {self.errors[-1][0]}: {self.errors[-1][1]}")
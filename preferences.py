@@ -1,7 +1,7 @@
 import bpy
 from bpy.types import AddonPreferences
-from bpy.props import BoolProperty, StringProperty, EnumProperty, CollectionProperty,IntProperty
-from . import translations
+from bpy.props import BoolProperty, StringProperty, EnumProperty, CollectionProperty,IntProperty, FloatProperty
+from . import translations, common
 
 # 添加类别项类型
 class ADDONMANAGER_CategoryExcludeItem(bpy.types.PropertyGroup):
@@ -12,6 +12,15 @@ class ADDONMANAGER_CategoryExcludeItem(bpy.types.PropertyGroup):
         default=False
     )
 
+def _reset_exclusion_page(self, context):
+    """搜索条件变化时回到第一页"""
+    if self.exclusion_page != 0:
+        self.exclusion_page = 0
+
+def _on_profiling_changed(self, context):
+    from . import profiler
+    profiler.on_profiling_changed(self, context)
+
 def update_language(self, context):
     """语言更新回调函数"""
     bpy.ops.addonmanager.change_language()
@@ -34,7 +43,8 @@ class ADDONMANAGER_preferences(AddonPreferences):
     favorite_categories: StringProperty(
         name="收藏的类别",
         description="收藏的类别列表，用逗号分隔",
-        default=""
+        default="",
+        update=lambda self, context: common.on_favorite_categories_changed(self, context)
     )
     #在ADDONMANAGER_preferences类中添加新属性
     auto_restore_on_exit: BoolProperty(
@@ -52,12 +62,89 @@ class ADDONMANAGER_preferences(AddonPreferences):
     excluded_categories: StringProperty(
         name="默认排除的类别（不建议修改）",
         description="始终排除的基础类别，用逗号分隔",
-        default="Item,Tool,View,Create,Relations,Edit,Physics,Grease Pencil"
+        default="Item,Tool,View,Create,Relations,Edit,Physics,Grease Pencil",
+        update=lambda self, context: common.on_excluded_categories_changed(self, context)
+    )
+    exclusion_patterns: StringProperty(
+        name="排除规则",
+        description="逗号分隔的排除规则：*Tools* 为通配符，^Studio_.* 或 re:... 为正则表达式，module:studio_* 按插件包名（扩展为 bl_ext.<仓库>. 之后的包名）或完整模块名匹配",
+        default="",
+        update=lambda self, context: common.on_excluded_categories_changed(self, context)
     )
     additional_excluded_categories: StringProperty(
         name="额外排除的类别",
         description="通过UI选择排除的额外类别",
-        default=""
+        default="",
+        update=lambda self, context: common.on_additional_excluded_changed(self, context)
+    )
+    auto_sync_panels: BoolProperty(
+        name="自动同步插件面板",
+        description="启用/禁用插件后自动增量更新类别列表，无需手动刷新",
+        default=True
+    )
+    sync_interval: FloatProperty(
+        name="同步间隔（秒）",
+        description="检查面板注册变化的时间间隔",
+        default=2.0,
+        min=0.5,
+        max=60.0
+    )
+    lazy_initialization: BoolProperty(
+        name="首次使用时再建立索引",
+        description="启动时不扫描面板，首次打开 Addon Mgr 标签时再建立类别索引",
+        default=False
+    )
+    run_in_background: BoolProperty(
+        name="后台模式下也启用",
+        description="以 --background 运行 Blender 时默认跳过扫描和面板移动，勾选后照常运行",
+        default=False
+    )
+    use_scan_cache: BoolProperty(
+        name="使用扫描缓存",
+        description="已启用的插件未变化时，启动时直接使用上次保存的扫描结果",
+        default=True
+    )
+    startup_budget_ms: IntProperty(
+        name="启动耗时预算（毫秒）",
+        description="启动建立类别索引超过该耗时时在控制台给出提示，0 表示不检查",
+        default=100,
+        min=0,
+        max=10000
+    )
+    debounce_category_switch: BoolProperty(
+        name="类别切换防抖",
+        description="快速切换类别时只在停顿后应用最后的选择，跳过中间的类别",
+        default=False
+    )
+    debounce_delay: FloatProperty(
+        name="防抖延迟（秒）",
+        description="最后一次切换后等待多久再移动面板",
+        default=0.2,
+        min=0.05,
+        max=2.0
+    )
+    profile_panel_draw: BoolProperty(
+        name="分析面板绘制耗时",
+        description="记录移入管理器的面板每次 draw / poll / draw_header 的耗时，结果显示在诊断信息中",
+        default=False,
+        update=lambda self, context: _on_profiling_changed(self, context)
+    )
+    draw_budget_ms: FloatProperty(
+        name="绘制预算（毫秒）",
+        description="载入类别时，测得的绘制耗时累计超出该预算的面板会被折叠或跳过，0 表示不限制（需要先有耗时数据）",
+        default=0.0,
+        min=0.0,
+        max=100.0,
+        update=lambda self, context: _on_profiling_changed(self, context)
+    )
+    draw_budget_mode: EnumProperty(
+        name="超出预算时",
+        description="如何处理超出绘制预算的面板",
+        items=[
+            ('COLLAPSE', "折叠", "以折叠状态显示面板，展开后才绘制内容"),
+            ('SKIP', "跳过", "暂不显示面板，可在管理器中点击后显示"),
+        ],
+        default='COLLAPSE'
     )
     # 添加用于控制UI显示的属性
     show_category_list: BoolProperty(
@@ -73,6 +160,27 @@ class ADDONMANAGER_preferences(AddonPreferences):
         min=1,
         max=5
     )
+    exclusion_search: StringProperty(
+        name="搜索类别",
+        description="按名称筛选可排除的类别",
+        default="",
+        options={'TEXTEDIT_UPDATE'},
+        update=_reset_exclusion_page
+    )
+    exclusion_page_size: IntProperty(
+        name="每页数量",
+        description="每页显示的类别数量",
+        default=30,
+        min=5,
+        max=200,
+        update=_reset_exclusion_page
+    )
+    exclusion_page: IntProperty(
+        name="页码",
+        description="当前显示的页（从 0 开始）",
+        default=0,
+        min=0
+    )
     available_categories: CollectionProperty(type=ADDONMANAGER_CategoryExcludeItem)
 
 
@@ -100,6 +208,33 @@ class ADDONMANAGER_preferences(AddonPreferences):
         box.label(text=translations.get_text("自动恢复设置:"), icon='RECOVER_LAST')
         box.prop(self, "auto_restore_on_new_file",text=translations.get_text("打开新文件时自动恢复面板（建议保持默认）"))
         layout.separator()
+
+        # 面板同步设置
+        box = layout.box()
+        box.label(text=translations.get_text("面板同步设置:"), icon='FILE_REFRESH')
+        row = box.row()
+        row.prop(self, "auto_sync_panels", text=translations.get_text("自动同步插件面板"))
+        sub = row.row()
+        sub.enabled = self.auto_sync_panels
+        sub.prop(self, "sync_interval", text=translations.get_text("同步间隔（秒）"))
+        row = box.row()
+        row.prop(self, "use_scan_cache", text=translations.get_text("使用扫描缓存"))
+        row.prop(self, "run_in_background", text=translations.get_text("后台模式下也启用"))
+        row = box.row()
+        row.prop(self, "lazy_initialization", text=translations.get_text("首次使用时再建立索引"))
+        row.prop(self, "startup_budget_ms", text=translations.get_text("启动耗时预算（毫秒）"))
+        row = box.row()
+        row.prop(self, "debounce_category_switch", text=translations.get_text("类别切换防抖"))
+        sub = row.row()
+        sub.enabled = self.debounce_category_switch
+        sub.prop(self, "debounce_delay", text=translations.get_text("防抖延迟（秒）"))
+        row = box.row()
+        row.prop(self, "profile_panel_draw", text=translations.get_text("分析面板绘制耗时"))
+        row.prop(self, "draw_budget_ms", text=translations.get_text("绘制预算（毫秒）"))
+        sub = row.row()
+        sub.enabled = self.draw_budget_ms > 0
+        sub.prop(self, "draw_budget_mode", text="")
+        layout.separator()
         
         # 类别排除设置
         box = layout.box()
@@ -108,6 +243,8 @@ class ADDONMANAGER_preferences(AddonPreferences):
         # 默认排除类别（文本输入）
         box.prop(self, "excluded_categories", text=translations.get_text("默认排除的类别（不建议修改）"))
         box.label(text=translations.get_text("默认排除类别 (英文逗号分隔，不建议修改)"), icon='INFO')
+        box.prop(self, "exclusion_patterns", text=translations.get_text("排除规则"))
+        box.label(text=translations.get_text("支持 *通配符*、^正则 或 re:正则、module:插件包名或模块名"), icon='INFO')
         
 
         # 扫描按钮
@@ -127,34 +264,53 @@ class ADDONMANAGER_preferences(AddonPreferences):
         
 
         
-        # 显示可选择的类别列表（仅当展开时）
+        # 显示可选择的类别列表（仅当展开时），只布局当前页
         if self.show_category_list and len(self.available_categories) > 0:
+            row = box.row(align=True)
+            row.prop(self, "exclusion_search", text="", icon='VIEWZOOM')
+            row.prop(self, "exclusion_page_size", text=translations.get_text("每页数量"))
+            row = box.row(align=True)
+            props = row.operator("addonmanager.select_excludable_categories", text=translations.get_text("全选匹配项"), icon='CHECKBOX_HLT')
+            props.action = 'SELECT'
+            props = row.operator("addonmanager.select_excludable_categories", text=translations.get_text("取消全选匹配项"), icon='CHECKBOX_DEHLT')
+            props.action = 'DESELECT'
+
+            visible = get_exclusion_view(self)
+            page_size = self.exclusion_page_size
+            page_count = max(1, (len(visible) + page_size - 1) // page_size)
+            page = min(self.exclusion_page, page_count - 1)
+            page_items = visible[page * page_size:(page + 1) * page_size]
+
             # 计算每列显示的项目数
-            total_items = len(self.available_categories)
+            total_items = len(page_items)
             items_per_column = max(1, total_items // self.columns_count + (1 if total_items % self.columns_count else 0))
-            
+
             # 创建多列布局
             box.label(text=translations.get_text("点击选择要额外排除的类别:"))
             row = box.row()
-            
-            # 获取默认排除的类别列表
-            default_excluded = [cat.strip() for cat in self.excluded_categories.split(',') if cat.strip()]
-            
+
             # 为每列创建一个列布局
             for col_idx in range(self.columns_count):
                 if col_idx * items_per_column >= total_items:
                     break
-                    
+
                 col = row.column()
-                for i in range(items_per_column):
-                    item_idx = col_idx * items_per_column + i
-                    if item_idx < total_items:
-                        item = self.available_categories[item_idx]
-                        # 如果类别已在默认排除列表中，则不显示
-                        if item.name not in default_excluded:
-                            item_row = col.row()
-                            item_row.prop(item, "exclude", text=item.name)
-            
+                for item_idx in page_items[col_idx * items_per_column:(col_idx + 1) * items_per_column]:
+                    item = self.available_categories[item_idx]
+                    col.prop(item, "exclude", text=item.name)
+
+            # 翻页
+            row = box.row(align=True)
+            sub = row.row(align=True)
+            sub.enabled = page > 0
+            props = sub.operator("addonmanager.change_exclusion_page", text="", icon='TRIA_LEFT')
+            props.delta = -1
+            row.label(text=translations.get_text("第 {}/{} 页（共 {} 项）").format(page + 1, page_count, len(visible)))
+            sub = row.row(align=True)
+            sub.enabled = page < page_count - 1
+            props = sub.operator("addonmanager.change_exclusion_page", text="", icon='TRIA_RIGHT')
+            props.delta = 1
+
             # 应用按钮
             row = box.row()
             row.operator("addonmanager.apply_excluded_categories", 
@@ -168,6 +324,26 @@ class ADDONMANAGER_preferences(AddonPreferences):
         box.prop(self, "favorite_categories", text=translations.get_text("收藏的类别"))
         box.label(text=translations.get_text("收藏类别 (英文逗号分隔)"), icon='INFO')
 
+# 可排除类别的筛选结果缓存：列表、默认排除集合和搜索词都不变时直接复用
+_exclusion_view_key = None
+_exclusion_view = []
+
+def get_exclusion_view(prefs):
+    """可排除类别列表中未被默认排除且匹配搜索词的项索引（按列表顺序）"""
+    global _exclusion_view_key, _exclusion_view
+    default_excluded = common.get_default_excluded_categories()
+    search_term = prefs.exclusion_search.strip().lower()
+    key = (common.available_categories_generation, len(prefs.available_categories),
+           default_excluded, search_term)
+    if key != _exclusion_view_key:
+        _exclusion_view = [
+            index for index, item in enumerate(prefs.available_categories)
+            if item.name not in default_excluded
+            and (not search_term or search_term in item.name.lower())
+        ]
+        _exclusion_view_key = key
+    return _exclusion_view
+
 # 获取插件偏好设置的辅助函数
 def get_preferences():
     return bpy.context.preferences.addons[__package__].preferences
@@ -0,0 +1,232 @@
+import json
+import time
+from collections import deque
+from . import common
+
+# --- 面板绘制耗时分析 ---
+# 可选模式：为移入管理器的面板包装 draw / poll / draw_header，记录每个面板的调用次数和耗时。
+# 只替换类属性，不重新注册面板；恢复时按原样写回（原本继承的方法则删除包装属性）
+
+PROFILED_METHODS = ('draw', 'poll', 'draw_header')
+# 每个方法保留的最近样本数（用于计算 p95）
+MAX_SAMPLES = 256
+
+_MISSING = object()
+_perf_counter = time.perf_counter
+
+# 面板 ID -> (面板类, {方法名: 类字典中的原始值或 _MISSING})
+_wrapped = {}
+# 面板 ID -> {方法名: MethodTiming}
+_timings = {}
+# 面板 ID -> 标题
+_labels = {}
+
+
+class MethodTiming:
+    """单个方法的耗时统计（秒）"""
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.samples = deque(maxlen=MAX_SAMPLES)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples.clear()
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def p95(self):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.mean * 1000,
+            'p95_ms': self.p95 * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+
+def is_enabled():
+    try:
+        from . import preferences
+        prefs = preferences.get_preferences()
+        # 绘制预算依赖测得的耗时，启用预算时也进行分析
+        return bool(prefs and (getattr(prefs, "profile_panel_draw", False)
+                               or getattr(prefs, "draw_budget_ms", 0) > 0))
+    except Exception:
+        return False
+
+
+def _timing(panel_idname, method):
+    methods = _timings.setdefault(panel_idname, {})
+    timing = methods.get(method)
+    if timing is None:
+        timing = methods[method] = MethodTiming()
+    return timing
+
+
+def _wrap_method(panel_idname, method, original):
+    timing = _timing(panel_idname, method)
+
+    def wrapper(self, context):
+        start = _perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            timing.add(_perf_counter() - start)
+    wrapper.__name__ = method
+    return wrapper
+
+
+def _wrap_poll(panel_idname, original):
+    timing = _timing(panel_idname, 'poll')
+
+    def poll(cls, context):
+        start = _perf_counter()
+        try:
+            return original(context)
+        finally:
+            timing.add(_perf_counter() - start)
+    return classmethod(poll)
+
+
+def wrap_panel(panel_idname, panel_cls):
+    """为面板包装绘制相关的方法（已包装时忽略；同名的新类先撤销旧类的包装）"""
+    data = _wrapped.get(panel_idname)
+    if data is not None:
+        if data[0] is panel_cls:
+            return
+        unwrap_panel(panel_idname)
+    originals = {}
+    for method in PROFILED_METHODS:
+        current = getattr(panel_cls, method, None)
+        if current is None:
+            continue
+        originals[method] = panel_cls.__dict__.get(method, _MISSING)
+        if method == 'poll':
+            setattr(panel_cls, method, _wrap_poll(panel_idname, current))
+        else:
+            setattr(panel_cls, method, _wrap_method(panel_idname, method, current))
+    _wrapped[panel_idname] = (panel_cls, originals)
+    _labels[panel_idname] = getattr(panel_cls, 'bl_label', "") or panel_idname
+
+
+def unwrap_panel(panel_idname):
+    """把面板的方法恢复为包装前的原样"""
+    data = _wrapped.pop(panel_idname, None)
+    if data is None:
+        return
+    panel_cls, originals = data
+    for method, original in originals.items():
+        try:
+            if original is _MISSING:
+                delattr(panel_cls, method)
+            else:
+                setattr(panel_cls, method, original)
+        except Exception as e:
+            print(f"Error restoring {method} of panel {panel_idname}: {e}")
+
+
+def unwrap_all():
+    for panel_idname in list(_wrapped):
+        unwrap_panel(panel_idname)
+
+
+def sync(managed_panels=None):
+    """让包装状态与当前管理的面板一致：启用时包装所有管理中的面板，其余的恢复
+
+    同名面板类被重载后，管理器记录中的类与包装的类不同，撤销旧类的包装并包装新类
+    """
+    if managed_panels is None:
+        managed_panels = common.currently_managed_panels
+    enabled = is_enabled()
+    for panel_idname, (panel_cls, originals) in list(_wrapped.items()):
+        if not enabled or panel_idname not in managed_panels:
+            unwrap_panel(panel_idname)
+            continue
+        entry = common.get_panel_entry(panel_idname)
+        if entry is None or entry.cls is not panel_cls:
+            unwrap_panel(panel_idname)
+    if not enabled:
+        return
+    for panel_idname in managed_panels:
+        if panel_idname not in _wrapped:
+            entry = common.get_panel_entry(panel_idname)
+            if entry is not None and entry.cls is not None:
+                wrap_panel(panel_idname, entry.cls)
+
+
+def on_profiling_changed(self, context):
+    """偏好设置 profile_panel_draw 的更新回调"""
+    sync()
+
+
+def clear():
+    """清空已收集的耗时（保留当前包装）"""
+    for panel_idname in list(_timings):
+        if panel_idname in _wrapped:
+            for timing in _timings[panel_idname].values():
+                timing.reset()
+        else:
+            del _timings[panel_idname]
+
+
+def get_draw_cost(panel_idname):
+    """面板每次重绘的平均耗时（秒，draw + draw_header + poll），没有数据时返回 None"""
+    methods = _timings.get(panel_idname)
+    if not methods or 'draw' not in methods or not methods['draw'].count:
+        return None
+    return sum(timing.mean for timing in methods.values())
+
+
+SORT_KEYS = {
+    'MEAN': lambda row: -row['mean_ms'],
+    'P95': lambda row: -row['p95_ms'],
+    'MAX': lambda row: -row['max_ms'],
+    'COUNT': lambda row: -row['count'],
+    'NAME': lambda row: row['label'].lower(),
+}
+
+
+def get_rows(sort_key='MEAN'):
+    """每个面板一行的统计（draw 的耗时，另附各方法的明细），按 sort_key 排序"""
+    rows = []
+    for panel_idname, methods in _timings.items():
+        draw = methods.get('draw')
+        if draw is None or not draw.count:
+            continue
+        row = draw.as_dict()
+        row['idname'] = panel_idname
+        row['label'] = _labels.get(panel_idname, panel_idname)
+        row['methods'] = {method: timing.as_dict() for method, timing in methods.items()}
+        rows.append(row)
+    rows.sort(key=SORT_KEYS.get(sort_key, SORT_KEYS['MEAN']))
+    return rows
+
+
+def export_json(filepath, sort_key='MEAN'):
+    """把统计写入 JSON 文件"""
+    data = {
+        'generated_at': time.time(),
+        'panels': get_rows(sort_key),
+    }
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return len(data['panels'])
@@ -1,6 +1,6 @@
 import bpy
 from bpy.types import PropertyGroup
-from bpy.props import StringProperty, IntProperty, CollectionProperty,BoolProperty
+from bpy.props import StringProperty, IntProperty, CollectionProperty,BoolProperty, EnumProperty
 from . import common
 
 # --- 列表项数据结构 ---
@@ -9,16 +9,17 @@ class ADDONMANAGER_CategoryItem(PropertyGroup):
     is_favorite: BoolProperty(
         name="Is Favorite",
         description="Mark this category as a favorite",
-        default=False
+        default=False,
+        update=common.on_category_item_changed
     )
 
 # --- 属性注册/注销 ---
 def register_properties():
     bpy.types.Scene.addon_manager_search_term = StringProperty(
         name="Search",
-        description="Filter addon categories by name",
+        description="Filter addon categories by name (fuzzy, ranked by relevance)",
         default="",
-        
+        options={'TEXTEDIT_UPDATE'}, # 输入时实时过滤
         update=common.update_list_filter # 也让搜索框触发更新
     )
     bpy.types.Scene.addon_manager_categories = CollectionProperty(type=ADDONMANAGER_CategoryItem)
@@ -33,6 +34,23 @@ def register_properties():
         default=False,
         update=common.update_list_filter # 使用相同的更新函数
     )
+    bpy.types.Scene.addon_manager_show_diagnostics = BoolProperty(
+        name="Show Diagnostics",
+        description="Show timing and counters of the last refresh, scan, switch and restore",
+        default=False
+    )
+    bpy.types.Scene.addon_manager_profile_sort = EnumProperty(
+        name="Sort By",
+        description="Sort the panel draw profile",
+        items=[
+            ('MEAN', "Mean", "Sort by mean draw time"),
+            ('P95', "P95", "Sort by 95th percentile draw time"),
+            ('MAX', "Max", "Sort by maximum draw time"),
+            ('COUNT', "Count", "Sort by number of draws"),
+            ('NAME', "Name", "Sort by panel title"),
+        ],
+        default='MEAN'
+    )
 
 def unregister_properties():
     props_to_delete = [
@@ -40,6 +58,8 @@ def unregister_properties():
         "addon_manager_categories",
         "addon_manager_category_index",
         "addon_manager_show_favorites_only", 
+        "addon_manager_show_diagnostics",
+        "addon_manager_profile_sort",
     ]
     for prop in props_to_delete:
         try:
@@ -0,0 +1,70 @@
+import bpy
+
+# --- 重绘调度 ---
+# 同一轮事件中的重绘请求先合并，由一次定时器回调统一处理：
+# 只标记侧边栏（UI 区域）可见的 3D 视图区域，偏好设置的变化只标记偏好设置区域，
+# 从不强制同步刷新窗口
+
+VIEW3D = 'VIEW3D'
+PREFERENCES = 'PREFERENCES'
+
+_pending = set()
+
+
+def request(target=VIEW3D):
+    """请求重绘，同一轮内的多次请求只处理一次"""
+    _pending.add(target)
+    if not bpy.app.timers.is_registered(_flush_timer):
+        bpy.app.timers.register(_flush_timer, first_interval=0.0)
+
+
+def cancel():
+    _pending.clear()
+    if bpy.app.timers.is_registered(_flush_timer):
+        bpy.app.timers.unregister(_flush_timer)
+
+
+def _flush_timer():
+    try:
+        flush()
+    except Exception as e:
+        print(f"Error tagging areas for redraw: {e}")
+    return None
+
+
+def _is_sidebar_visible(area):
+    """3D 视图的侧边栏是否显示"""
+    space = area.spaces.active
+    if space is not None and not getattr(space, "show_region_ui", True):
+        return False
+    for region in area.regions:
+        if region.type == 'UI':
+            return region.width > 1
+    return False
+
+
+def flush(context=None):
+    """立即处理所有待重绘请求
+
+    Returns:
+        int: 标记重绘的区域数
+    """
+    if not _pending:
+        return 0
+    targets = set(_pending)
+    _pending.clear()
+    if context is None:
+        context = bpy.context
+
+    tagged = 0
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                if VIEW3D in targets and _is_sidebar_visible(area):
+                    area.tag_redraw()
+                    tagged += 1
+            elif area.type == 'PREFERENCES':
+                if PREFERENCES in targets:
+                    area.tag_redraw()
+                    tagged += 1
+    return tagged
@@ -0,0 +1,148 @@
+import bpy
+import hashlib
+import json
+import os
+import sys
+from . import common, panel_index
+
+# --- 扫描结果磁盘缓存 ---
+# 已启用插件及其版本不变时，下次启动直接使用上次的扫描结果，
+# 只按 idname 取回面板类并逐个校验，而不再遍历整个 Panel 类树
+
+CACHE_VERSION = 1
+CACHE_DIRNAME = "addon_manager"
+CACHE_FILENAME = "scan_cache.json"
+
+
+def get_cache_path():
+    """缓存文件路径（位于 Blender 用户配置目录）"""
+    cache_dir = bpy.utils.user_resource('CONFIG', path=CACHE_DIRNAME, create=True)
+    return os.path.join(cache_dir, CACHE_FILENAME)
+
+
+def _module_version(module_name):
+    """获取插件模块的版本，没有 bl_info 时使用文件修改时间"""
+    module = sys.modules.get(module_name)
+    if module is None:
+        return None
+    bl_info = getattr(module, 'bl_info', None)
+    if isinstance(bl_info, dict) and 'version' in bl_info:
+        return list(bl_info['version'])
+    version = getattr(module, '__version__', None)
+    if version is not None:
+        return str(version)
+    module_file = getattr(module, '__file__', None)
+    if module_file:
+        try:
+            return int(os.path.getmtime(module_file))
+        except OSError:
+            pass
+    return None
+
+
+def compute_fingerprint():
+    """根据 Blender 版本和已启用插件（含版本）计算指纹"""
+    addons = sorted(bpy.context.preferences.addons.keys())
+    data = {
+        'blender': list(bpy.app.version),
+        'addons': [[name, _module_version(name)] for name in addons],
+    }
+    text = json.dumps(data, sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _type_names_digest():
+    """bpy.types 成员名集合的摘要，用于确认注册的类型没有变化"""
+    names = sorted(dir(bpy.types))
+    return hashlib.sha1("\n".join(names).encode('utf-8')).hexdigest()
+
+
+def is_enabled():
+    try:
+        from . import preferences
+        prefs = preferences.get_preferences()
+        return bool(prefs and getattr(prefs, "use_scan_cache", True))
+    except Exception:
+        return True
+
+
+def save():
+    """把当前面板索引中的 N 面板写入缓存"""
+    if not is_enabled():
+        return False
+    panels = {}
+    for record in panel_index.iter_sidebar_records():
+        if record.is_registered and record.has_required_attrs and record.category:
+            panels[record.idname] = record.category
+
+    data = {
+        'version': CACHE_VERSION,
+        'fingerprint': compute_fingerprint(),
+        'type_names': _type_names_digest(),
+        'panels': panels,
+    }
+    try:
+        path = get_cache_path()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error saving scan cache: {e}")
+        return False
+
+
+def _read():
+    path = get_cache_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading scan cache: {e}")
+        return None
+
+
+def load_into_index():
+    """指纹匹配时用缓存建立面板索引
+
+    Returns:
+        bool: 成功使用缓存返回 True；缓存缺失、过期或校验失败返回 False（需要完整扫描）
+    """
+    if not is_enabled():
+        return False
+    data = _read()
+    if not data or data.get('version') != CACHE_VERSION:
+        return False
+    if data.get('fingerprint') != compute_fingerprint():
+        return False
+    if data.get('type_names') != _type_names_digest():
+        return False
+
+    # 逐个取回面板类并校验，任何不一致都放弃缓存
+    classes = []
+    for idname, category in data.get('panels', {}).items():
+        panel_cls = getattr(bpy.types, idname, None)
+        if not isinstance(panel_cls, type) or not issubclass(panel_cls, bpy.types.Panel):
+            return False
+        current_category = getattr(panel_cls, 'bl_category', None)
+        if idname in common.currently_managed_panels and idname in common.original_categories:
+            current_category = common.original_categories[idname].original_category
+        if current_category != category:
+            return False
+        classes.append(panel_cls)
+
+    panel_index.build_index_from(classes)
+    return True
+
+
+def clear():
+    """删除缓存文件"""
+    try:
+        path = get_cache_path()
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError as e:
+        print(f"Error removing scan cache: {e}")
@@ -0,0 +1,171 @@
+import re
+
+# --- 模糊搜索 ---
+# 刷新后为类别名建立一次 n-gram 倒排索引；每次按键只对候选项打分，
+# 结果按匹配程度排序，例如 "gpt" 可以找到 "GP Tools"
+
+_WORD_SPLIT = re.compile(r"[^0-9a-zA-Z一-鿿]+|(?<=[a-z])(?=[A-Z])")
+
+# 候选项至少要命中查询 n-gram 的比例（允许少量拼写错误）
+MIN_GRAM_RATIO = 0.5
+# 首字母缩写索引的最大长度
+MAX_INITIALS = 4
+
+
+def _compact(text):
+    """去掉空白和分隔符后的小写文本"""
+    return "".join(part for part in _WORD_SPLIT.split(text) if part).lower()
+
+
+def _grams(text):
+    """文本的单字符和二元组集合"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _query_grams(text):
+    """查询使用的 n-gram：长度为 1 时用单字符，否则用二元组"""
+    if len(text) == 1:
+        return {text}
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _subsequence_score(query, text):
+    """query 是否为 text 的子序列；是则返回连续程度得分，否则返回 None"""
+    position = -1
+    gaps = 0
+    for char in query:
+        found = text.find(char, position + 1)
+        if found < 0:
+            return None
+        if position >= 0 and found != position + 1:
+            gaps += 1
+        position = found
+    return max(0, 100 - gaps * 15)
+
+
+class SearchIndex:
+    """类别名的 n-gram 倒排索引"""
+
+    def __init__(self, names):
+        self.names = [name.lower() for name in names]
+        self.words = []
+        self.compact = []
+        self.initials = []
+        self.postings = {}
+        # 单词首字母缩写的前缀 -> 项索引，用于 "q r" 找到 "Quad Remesher"
+        self.initial_postings = {}
+        for index, name in enumerate(names):
+            words = [word.lower() for word in _WORD_SPLIT.split(name) if word]
+            compact = "".join(words)
+            initials = "".join(word[0] for word in words)
+            self.words.append(words)
+            self.compact.append(compact)
+            self.initials.append(initials)
+            for gram in _grams(compact):
+                self.postings.setdefault(gram, set()).add(index)
+            for length in range(1, min(len(initials), MAX_INITIALS) + 1):
+                self.initial_postings.setdefault(initials[:length], set()).add(index)
+        self._results = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, query):
+        grams = _query_grams(query)
+        if not grams:
+            return {}
+        hits = {}
+        for gram in grams:
+            for index in self.postings.get(gram, ()):
+                hits[index] = hits.get(index, 0) + 1
+        required = max(1, int(len(grams) * MIN_GRAM_RATIO + 0.5))
+        candidates = {index: count / len(grams) for index, count in hits.items() if count >= required}
+        for index in self.initial_postings.get(query[:MAX_INITIALS], ()):
+            candidates.setdefault(index, 0.0)
+        return candidates
+
+    def _word_prefix_match(self, index, query_words):
+        """查询中的每个词是否依次为名称中某个词的前缀"""
+        words = self.words[index]
+        position = 0
+        for query_word in query_words:
+            while position < len(words) and not words[position].startswith(query_word):
+                position += 1
+            if position >= len(words):
+                return False
+            position += 1
+        return True
+
+    def _score(self, index, query, compact_query, query_words, gram_ratio):
+        name = self.names[index]
+        compact = self.compact[index]
+        if name == query or compact == compact_query:
+            return 1000.0
+        if name.startswith(query) or compact.startswith(compact_query):
+            return 900.0 - len(compact) * 0.1
+        position = name.find(query)
+        if position >= 0:
+            return 700.0 - position - len(compact) * 0.1
+        if len(query_words) > 1 and self._word_prefix_match(index, query_words):
+            return 650.0 - len(compact) * 0.1
+        if self.initials[index].startswith(compact_query):
+            return 600.0 - len(compact) * 0.1
+        subsequence = _subsequence_score(compact_query, compact)
+        if subsequence is not None:
+            return 300.0 + subsequence - len(compact) * 0.1
+        # 仅 n-gram 部分命中（拼写错误等），得分较低
+        return gram_ratio * 200.0
+
+    def search(self, query):
+        """返回 {项索引: 得分}，得分越高越匹配"""
+        query = query.strip().lower()
+        if not query:
+            return {}
+        cached = self._results.get(query)
+        if cached is not None:
+            return cached
+
+        compact_query = _compact(query)
+        query_words = [word for word in _WORD_SPLIT.split(query) if word]
+        scores = {}
+        if compact_query:
+            for index, gram_ratio in self._candidates(compact_query).items():
+                score = self._score(index, query, compact_query, query_words, gram_ratio)
+                if score > 0:
+                    scores[index] = score
+
+        # 只保留最近的若干次查询结果
+        if len(self._results) > 64:
+            self._results.clear()
+        self._results[query] = scores
+        return scores
+
+
+def rank_order(scores, name_order):
+    """根据得分生成 UIList 的排序数组
+
+    Args:
+        scores: {项索引: 得分}
+        name_order: 按名称排序时的 ordered 数组（ordered[i] 为第 i 项的新位置）
+
+    Returns:
+        list: 匹配项按得分从高到低排在前面，其余项保持名称顺序
+    """
+    count = len(name_order)
+    ranked = sorted(scores, key=lambda index: (-scores[index], name_order[index]))
+    ordered = [0] * count
+    position = 0
+    for index in ranked:
+        ordered[index] = position
+        position += 1
+    # 按名称顺序遍历其余项（name_order 的逆排列）
+    by_name = [0] * count
+    for index, name_position in enumerate(name_order):
+        by_name[name_position] = index
+    for index in by_name:
+        if index not in scores:
+            ordered[index] = position
+            position += 1
+    return ordered
@@ -0,0 +1,120 @@
+import bpy
+from . import common, panel_index, scan_cache, stats, redraw
+
+# --- 启动流程 ---
+# 一次完成可用类别列表、排除集合和场景类别列表的建立，
+# 不经过操作符分发，也不强制同步重绘
+
+# 索引状态：'idle' 尚未建立，'pending' 已安排定时器，'ready' 已建立
+_state = 'idle'
+
+
+def is_ready():
+    return _state == 'ready'
+
+
+def mark_ready():
+    """标记类别索引已建立（例如手动刷新之后）"""
+    global _state
+    _state = 'ready'
+
+
+def reset_state():
+    global _state
+    if bpy.app.timers.is_registered(_startup_timer):
+        bpy.app.timers.unregister(_startup_timer)
+    _state = 'idle'
+
+
+def _startup_timer():
+    try:
+        run_startup()
+    except Exception as e:
+        print(f"Error during initial category refresh: {e}")
+        mark_ready()
+    return None
+
+
+def request_startup(first_interval=0.0):
+    """安排一次启动索引建立（已安排或已完成时忽略）
+
+    面板 draw 中不能修改数据，因此总是通过定时器执行。
+    """
+    global _state
+    if _state != 'idle':
+        return
+    _state = 'pending'
+    bpy.app.timers.register(_startup_timer, first_interval=first_interval)
+
+
+def is_lazy():
+    """是否在首次打开管理器面板时才建立索引"""
+    try:
+        from . import preferences
+        prefs = preferences.get_preferences()
+        return bool(prefs and getattr(prefs, "lazy_initialization", False))
+    except Exception:
+        return False
+
+
+def run_startup(context=None):
+    """插件启动时建立类别索引
+
+    Returns:
+        OperationStats: 本次启动的统计（total 为总耗时，秒）
+    """
+    from . import preferences
+    if context is None:
+        context = bpy.context
+    scene = context.scene
+    prefs = preferences.get_preferences()
+    startup_stats = stats.begin('startup')
+
+    # 1. 面板索引：优先使用磁盘缓存，否则遍历一次类树
+    with startup_stats.phase('index'):
+        from_cache = scan_cache.load_into_index()
+        if not from_cache:
+            panel_index.build_index()
+        records = panel_index.get_index()
+    startup_stats.set('from_cache', from_cache)
+
+    # 2. 可用类别与排除集合
+    with startup_stats.phase('exclusions'):
+        available = common.collect_available_categories(records)
+        default_excluded = common.get_default_excluded_categories()
+        previous_additional = set(common.get_additional_excluded_categories())
+
+        # 与扫描操作相同，按差异同步：列表未变化时不改动偏好设置，也保留尚未应用的勾选
+        common.sync_available_categories(prefs, available, default_excluded | previous_additional)
+
+        # 与“应用排除设置”相同：只保留当前仍然存在的额外排除类别
+        additional = [cat for cat in sorted(available)
+                      if cat in previous_additional and cat not in default_excluded]
+        common.set_additional_excluded_categories(additional)
+
+    # 3. 场景类别列表
+    with startup_stats.phase('categories'), common.bulk_update(startup_stats):
+        common.reset_managed_panels()
+        scene.addon_manager_categories.clear()
+        common.clear_panel_entries()
+        favorites = common.load_favorites_from_preferences()
+        found_categories = common.register_sidebar_panels(records, common.get_exclusion_matcher(), startup_stats)
+        common.fill_category_list(scene, found_categories, favorites)
+
+    if not from_cache:
+        with startup_stats.phase('save_cache'):
+            scan_cache.save()
+
+    startup_stats.finish()
+    mark_ready()
+
+    # 请求重绘（不强制同步刷新窗口）；可排除类别列表也已更新
+    redraw.request(redraw.VIEW3D)
+    redraw.request(redraw.PREFERENCES)
+
+    # 耗时记录在统计中；只有超出启动预算时才提示
+    total_ms = startup_stats.total * 1000
+    budget_ms = getattr(prefs, "startup_budget_ms", 0)
+    if budget_ms and total_ms > budget_ms:
+        print(f"Addon Manager startup took {total_ms:.1f} ms (budget {budget_ms} ms)")
+    return startup_stats
@@ -0,0 +1,81 @@
+import time
+from contextlib import contextmanager
+
+# --- 运行统计 ---
+# 记录刷新、扫描、切换、恢复等操作每个阶段的耗时和计数，
+# 可在 Python 中读取（stats.last_stats），也会显示在主面板的诊断信息中
+
+class OperationStats:
+    """一次操作的统计信息"""
+
+    def __init__(self, name):
+        self.name = name
+        self.phases = {}
+        self.counters = {}
+        self.total = 0.0
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._phase_starts = {}
+
+    @contextmanager
+    def phase(self, name):
+        """统计一个阶段的耗时（同名阶段累加）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def phase_start(self, name):
+        """开始一个阶段（用于不便使用 with 语句的长代码段）"""
+        self._phase_starts[name] = time.perf_counter()
+
+    def phase_end(self, name):
+        """结束由 phase_start 开始的阶段"""
+        start = self._phase_starts.pop(name, None)
+        if start is not None:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name, value=1):
+        """累加计数器"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        """设置计数器的值"""
+        self.counters[name] = value
+
+    def finish(self):
+        """结束统计并保存为该操作的最近一次结果"""
+        self.total = time.perf_counter() - self._start
+        last_stats[self.name] = self
+        return self
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'started_at': self.started_at,
+            'total': self.total,
+            'phases': dict(self.phases),
+            'counters': dict(self.counters),
+        }
+
+    def __repr__(self):
+        return f"<OperationStats {self.name} {self.total * 1000:.2f} ms>"
+
+
+# 操作名 -> 最近一次的统计
+last_stats = {}
+
+
+def begin(name):
+    """开始统计一次操作"""
+    return OperationStats(name)
+
+
+def get_stats(name):
+    """获取某个操作最近一次的统计，没有时返回 None"""
+    return last_stats.get(name)
+
+
+def clear():
+    last_stats.clear()
@@ -29,6 +29,28 @@ translations_dict = {
         ("*", "收藏设置"): "收藏设置",
         ("*", "收藏的类别"): "收藏的类别",
         ("*", "收藏类别 (英文逗号分隔)"): "收藏类别 (英文逗号分隔)",
+        ("*", "面板同步设置:"): "面板同步设置:",
+        ("*", "自动同步插件面板"): "自动同步插件面板",
+        ("*", "同步间隔（秒）"): "同步间隔（秒）",
+        ("*", "类别切换防抖"): "类别切换防抖",
+        ("*", "防抖延迟（秒）"): "防抖延迟（秒）",
+        ("*", "诊断信息"): "诊断信息",
+        ("*", "使用扫描缓存"): "使用扫描缓存",
+        ("*", "启动耗时预算（毫秒）"): "启动耗时预算（毫秒）",
+        ("*", "后台模式下也启用"): "后台模式下也启用",
+        ("*", "首次使用时再建立索引"): "首次使用时再建立索引",
+        ("*", "正在建立类别索引…"): "正在建立类别索引…",
+        ("*", "排除规则"): "排除规则",
+        ("*", "支持 *通配符*、^正则 或 re:正则、module:插件包名或模块名"): "支持 *通配符*、^正则 或 re:正则、module:插件包名或模块名",
+        ("*", "暂无统计数据"): "暂无统计数据",
+        ("*", "每页数量"): "每页数量",
+        ("*", "全选匹配项"): "全选匹配项",
+        ("*", "取消全选匹配项"): "取消全选匹配项",
+        ("*", "第 {}/{} 页（共 {} 项）"): "第 {}/{} 页（共 {} 项）",
+        ("*", "分析面板绘制耗时"): "分析面板绘制耗时",
+        ("*", "面板"): "面板",
+        ("*", "绘制预算（毫秒）"): "绘制预算（毫秒）",
+        ("*", "超出绘制预算已跳过:"): "超出绘制预算已跳过:",
     },
     "en_US": {
         # UI 相关翻译
@@ -58,6 +80,28 @@ translations_dict = {
         ("*", "收藏设置"): "Favorite Settings",
         ("*", "收藏的类别"): "Favorite Categories",
         ("*", "收藏类别 (英文逗号分隔)"): "Favorite categories (comma separated)",
+        ("*", "面板同步设置:"): "Panel Sync Settings:",
+        ("*", "自动同步插件面板"): "Auto-sync addon panels",
+        ("*", "同步间隔（秒）"): "Sync interval (s)",
+        ("*", "类别切换防抖"): "Debounce category switching",
+        ("*", "防抖延迟（秒）"): "Debounce delay (s)",
+        ("*", "诊断信息"): "Diagnostics",
+        ("*", "使用扫描缓存"): "Use scan cache",
+        ("*", "启动耗时预算（毫秒）"): "Startup budget (ms)",
+        ("*", "后台模式下也启用"): "Also run in background mode",
+        ("*", "首次使用时再建立索引"): "Build index on first use",
+        ("*", "正在建立类别索引…"): "Indexing categories…",
+        ("*", "排除规则"): "Exclusion Rules",
+        ("*", "支持 *通配符*、^正则 或 re:正则、module:插件包名或模块名"): "Supports *glob*, ^regex or re:regex, and module:addon package or module name",
+        ("*", "暂无统计数据"): "No statistics yet",
+        ("*", "每页数量"): "Per page",
+        ("*", "全选匹配项"): "Select Matching",
+        ("*", "取消全选匹配项"): "Deselect Matching",
+        ("*", "第 {}/{} 页（共 {} 项）"): "Page {}/{} ({} items)",
+        ("*", "分析面板绘制耗时"): "Profile panel draw time",
+        ("*", "面板"): "Panel",
+        ("*", "绘制预算（毫秒）"): "Draw budget (ms)",
+        ("*", "超出绘制预算已跳过:"): "Skipped (over draw budget):",
     }
 }
 
@@ -1,7 +1,8 @@
 import bpy
 from bpy.types import Panel, UIList
 from bpy.app.handlers import persistent
-from . import common, preferences, operators, translations
+from . import common, preferences, operators, translations, stats, startup, search, profiler, draw_budget
+from .panel_moves import PanelMoveTransaction
 
 # --- UIList 实现 ---
 class ADDONMANAGER_UL_category_list(UIList):
@@ -29,48 +30,53 @@ class ADDONMANAGER_UL_category_list(UIList):
     def filter_items(self, context, data, propname):
         """ Filter and order items in the list """
         items = getattr(data, propname)
-        helper_funcs = bpy.types.UI_UL_list
-
-        search_term = context.scene.addon_manager_search_term.lower()
-        show_only_favs = context.scene.addon_manager_show_favorites_only
-        # 初始化 filtered 列表，长度与 items 相同
-        # 默认标记为 0 (或表示“不显示”的任何适当值)
-        # 只有匹配的项才会被标记为 self.bitflag_filter_item
-        filtered = [0] * len(items)
-        ordered = [] # 排序列表将在后面填充
+        scene = context.scene
+
+        search_term = scene.addon_manager_search_term.strip().lower()
+        show_only_favs = scene.addon_manager_show_favorites_only
+
+        # 集合内容的版本：类别列表或收藏状态变化时才会改变
+        scene_key = scene.as_pointer() if hasattr(scene, "as_pointer") else id(scene)
+        generation_key = (scene_key, propname, common.category_list_generation, len(items))
+        filter_key = generation_key + (search_term, show_only_favs, self.bitflag_filter_item)
+        if _filter_cache.get('key') == filter_key:
+            return _filter_cache['filtered'], _filter_cache['ordered']
+
+        # 排序、小写名称和搜索索引每个版本只建立一次
+        if _sort_cache.get('key') != generation_key:
+            item_names = [getattr(item, "name", "") for item in items]
+            _sort_cache['key'] = generation_key
+            _sort_cache['favorites'] = [item.is_favorite for item in items]
+            # Ordering (by name)
+            _sort_cache['ordered'] = bpy.types.UI_UL_list.sort_items_by_name(items, "name")
+            _sort_cache['search'] = search.SearchIndex(item_names)
+        favorites = _sort_cache['favorites']
+        ordered = _sort_cache['ordered']
+
         # Filtering
-        if search_term or show_only_favs:
-            for i, item in enumerate(items):
-                # 检查收藏状态
-                is_fav = item.is_favorite
-
-                # 如果没有搜索词 (search_term 为空)，则 name_match 为 True
-                item_name = getattr(item, "name", "").lower()
-                name_match = (not search_term or search_term in item_name)
-
-                # --- 决定是否显示该项 ---
-                show_item = False
-                if show_only_favs:
-                    # 如果只显示收藏：必须是收藏项 AND 匹配搜索词
-                    if is_fav and name_match:
-                        show_item = True
-                else:
-                    # 如果不只显示收藏：只需要匹配搜索词
-                    if name_match:
-                        show_item = True
-                # -------------------------
-
-                # 如果决定显示，则设置标志位
-                if show_item:
-                    filtered[i] = self.bitflag_filter_item
+        flag = self.bitflag_filter_item
+        if search_term:
+            # 模糊搜索：匹配项按得分排序
+            scores = _sort_cache['search'].search(search_term)
+            filtered = [
+                flag if (i in scores and (not show_only_favs or is_fav)) else 0
+                for i, is_fav in enumerate(favorites)
+            ]
+            ordered = search.rank_order(scores, ordered)
+        elif show_only_favs:
+            filtered = [flag if is_fav else 0 for is_fav in favorites]
         else:
-            filtered = [self.bitflag_filter_item] * len(items)
-
-        # Ordering (by name)
-        ordered = helper_funcs.sort_items_by_name(items, "name")
+            filtered = [flag] * len(items)
 
+        _filter_cache['key'] = filter_key
+        _filter_cache['filtered'] = filtered
+        _filter_cache['ordered'] = ordered
         return filtered, ordered
 
+# filter_items 的缓存：排序结果按集合版本缓存，过滤结果按 (版本, 搜索词, 仅收藏) 缓存
+_sort_cache = {}
+_filter_cache = {}
+
 # --- 主管理面板 ---
 class ADDONMANAGER_PT_main(Panel):
     bl_label = "Addon Manager"
@@ -88,18 +94,24 @@ class ADDONMANAGER_PT_main(Panel):
         layout = self.layout
         scene = context.scene
 
-
+        # 懒加载：首次绘制时才安排建立类别索引
+        if not startup.is_ready():
+            startup.request_startup()
+            layout.label(text=translations.get_text("正在建立类别索引…"), icon='TIME')
+            return
         
         # --- 1. 搜索和刷新 ---
         row = layout.row(align=True)
         row.prop(scene, "addon_manager_search_term", text="", icon='VIEWZOOM')
+        row.operator("addonmanager.jump_to_panel", text="", icon='ZOOM_SELECTED')
         row.operator("addonmanager.refresh_categories", text="", icon='FILE_REFRESH')
         # 添加提示
         if scene.addon_manager_category_index != -1:
             # 放在按钮同行右侧
             row.label(text="", icon='INFO') # 图标带默认 tooltip
-            # 或者在下一行显示文字
-            layout.label(text=translations.get_text("刷新来重置视图/释放插件"), icon='INFO')
+            # 或者在下一行显示文字（刷新默认保留选择，这里取消选择以释放插件）
+            props = layout.operator("addonmanager.refresh_categories", text=translations.get_text("刷新来重置视图/释放插件"), icon='INFO')
+            props.keep_selection = False
         # 添加设置按钮，跳转到偏好设置
         show_favs_icon = 'SOLO_ON' if scene.addon_manager_show_favorites_only else 'SOLO_OFF'
         row.prop(
@@ -152,6 +164,84 @@ class ADDONMANAGER_PT_main(Panel):
         else:
             info_box.label(text=translations.get_text("在此处查看其面板_刷新按钮释放插件."), icon='INFO')
 
+        # 绘制预算跳过的面板，点击后照常绘制
+        skipped = draw_budget.get_skipped()
+        if skipped:
+            skip_box = layout.box()
+            skip_box.label(text=translations.get_text("超出绘制预算已跳过:"), icon='SORTTIME')
+            for entry in skipped:
+                row = skip_box.row()
+                row.label(text=entry.label)
+                props = row.operator("addonmanager.show_skipped_panel", text="", icon='HIDE_OFF')
+                props.panel = entry.idname
+
+        # --- 4. 诊断信息（可折叠） ---
+        diag_box = layout.box()
+        show_diag = scene.addon_manager_show_diagnostics
+        diag_box.prop(
+            scene,
+            "addon_manager_show_diagnostics",
+            text=translations.get_text("诊断信息"),
+            icon='TRIA_DOWN' if show_diag else 'TRIA_RIGHT',
+            emboss=False
+        )
+        if show_diag:
+            draw_diagnostics(diag_box)
+            draw_panel_profile(diag_box, scene)
+
+# 诊断信息：最近一次刷新/扫描/切换/恢复的各阶段耗时与计数
+DIAGNOSTIC_OPERATIONS = ('startup', 'refresh', 'scan', 'switch', 'restore')
+
+def draw_diagnostics(layout):
+    has_stats = False
+    for name in DIAGNOSTIC_OPERATIONS:
+        op_stats = stats.get_stats(name)
+        if op_stats is None:
+            continue
+        has_stats = True
+        col = layout.column(align=True)
+        col.label(text=f"{name}: {op_stats.total * 1000:.2f} ms", icon='TIME')
+        for phase_name, seconds in op_stats.phases.items():
+            col.label(text=f"    {phase_name}: {seconds * 1000:.2f} ms")
+        for counter_name, value in op_stats.counters.items():
+            col.label(text=f"    {counter_name}: {value}")
+    if not has_stats:
+        layout.label(text=translations.get_text("暂无统计数据"), icon='INFO')
+
+# 绘制耗时分析列表最多显示的行数
+MAX_PROFILE_ROWS = 20
+
+def draw_panel_profile(layout, scene):
+    """被管理面板的绘制耗时（可排序，可导出为 JSON）"""
+    prefs = preferences.get_preferences()
+    layout.separator()
+    row = layout.row(align=True)
+    row.prop(prefs, "profile_panel_draw", text=translations.get_text("分析面板绘制耗时"), icon='SORTTIME')
+    row.operator("addonmanager.export_draw_profile", text="", icon='EXPORT')
+    row.operator("addonmanager.clear_draw_profile", text="", icon='TRASH')
+
+    rows = profiler.get_rows(scene.addon_manager_profile_sort)
+    if not rows:
+        if prefs.profile_panel_draw:
+            layout.label(text=translations.get_text("暂无统计数据"), icon='INFO')
+        return
+
+    layout.row(align=True).prop(scene, "addon_manager_profile_sort", expand=True)
+    col = layout.column(align=True)
+    header = col.row()
+    header.label(text=translations.get_text("面板"))
+    for text in ("n", "mean", "p95", "max"):
+        header.label(text=text)
+    for data in rows[:MAX_PROFILE_ROWS]:
+        line = col.row()
+        line.label(text=data['label'])
+        line.label(text=str(data['count']))
+        line.label(text=f"{data['mean_ms']:.2f}")
+        line.label(text=f"{data['p95_ms']:.2f}")
+        line.label(text=f"{data['max_ms']:.2f}")
+    if len(rows) > MAX_PROFILE_ROWS:
+        col.label(text=f"… +{len(rows) - MAX_PROFILE_ROWS}")
+
 # 恢复面板函数 - 在注销插件前调用
 def restore_panels(force=False):
 
@@ -159,35 +249,42 @@ def restore_panels(force=False):
         #print("Auto restore disabled in preferences, skipping...")
         return
     #print("Restoring managed panels to their original categories...")
+    # 丢弃尚未应用的防抖切换，避免恢复后面板又被移入管理器
+    common.cancel_pending_switch()
+    common.prune_dead_entries()
+    # 先撤销绘制耗时分析的包装和绘制预算，恢复面板原有的方法和选项
+    profiler.unwrap_all()
+    draw_budget.restore_all()
     
-    panels_to_restore = list(common.currently_managed_panels)
-    restored_count = 0
-    error_count = 0
-    for panel_idname in panels_to_restore:
-        try:
-            if panel_idname in common.original_categories:
-                panel_cls = common.original_categories[panel_idname]['class']
-                original_cat = common.original_categories[panel_idname]['original_category']
-                
+    restore_stats = stats.begin('restore')
+    with restore_stats.phase('collect'):
+        transaction = PanelMoveTransaction()
+        for panel_idname in common.currently_managed_panels:
+            entry = common.get_panel_entry(panel_idname)
+            if entry is not None:
+                panel_cls = entry.cls
+                original_cat = entry.original_category
+
                 # 检查它是否真的在管理类别下
-                if hasattr(panel_cls, 'bl_category') and panel_cls.bl_category == common.PANEL_CATEGORY:
-                    try:
-                        bpy.utils.unregister_class(panel_cls)
-                        panel_cls.bl_category = original_cat
-                        bpy.utils.register_class(panel_cls)
-                        restored_count += 1
-                    except Exception as e:
-                        print(f"Error restoring panel {panel_idname}: {e}")
-                        error_count += 1
-                else:
-                    pass
+                if getattr(panel_cls, 'bl_category', None) == common.PANEL_CATEGORY:
+                    transaction.add(panel_idname, panel_cls, original_cat)
             else:
                 pass
                 #print(f"Warning: Cannot find original data for panel {panel_idname}")
-        except Exception as e:
-            print(f"Unexpected error processing panel {panel_idname}: {e}")
-            error_count += 1
+
+    error_count = 0
+    with restore_stats.phase('move'):
+        committed = transaction.commit(drop_failed=True)
+    if not committed or transaction.errors:
+        for panel_idname, message in transaction.errors:
+            print(f"Error restoring panel {panel_idname}: {message}")
+        error_count = len(transaction.errors)
+    restored_count = len(transaction.moved)
     common.currently_managed_panels.clear()
+
+    restore_stats.set('restored_panels', restored_count)
+    restore_stats.set('errors', error_count)
+    restore_stats.finish()
     
     print(f"Panel restoration complete: {restored_count} restored, {error_count} errors")
 
@@ -232,7 +329,13 @@ def register():
             bpy.utils.register_class(cls)
         except ValueError as e:
             print(f"Warning: Could not register class {cls.__name__}: {e}")
-    # 注册处理器
+
+def register_handlers():
+    """注册恢复面板用的处理器
+
+    由插件的 register 在所有模块（包括偏好设置）注册完成、确定不是后台模式后调用，
+    后台模式不会移动面板，无需恢复处理器
+    """
     bpy.app.handlers.load_post.append(load_handler)
     bpy.app.handlers.save_pre.append(save_handler)
 
@@ -246,7 +349,8 @@ def register():
 
 def unregister():
     # 先恢复面板
-    restore_panels(force=True)
+    if common.currently_managed_panels:
+        restore_panels(force=True)
     
     # 移除处理器
     if load_handler in bpy.app.handlers.load_post: